@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Category, Location, Post, Comment
+from .models import Category, Comment, ImageJob, Location, Post
 
 
 class LocationAdmin(admin.ModelAdmin):
@@ -39,12 +39,20 @@ class PostAdmin(admin.ModelAdmin):
         'location',
     )
 
-    @admin.display(description='Комментариев')
-    def comment_count(self, post):
-        return post.comments.count()
+
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'image_name',
+        'post',
+        'status',
+        'attempts',
+        'created_at',
+    )
+    list_filter = ('status',)
 
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Location, LocationAdmin)
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Comment)
+admin.site.register(ImageJob, ImageJobAdmin)
@@ -0,0 +1,23 @@
+"""SQLite для базы, в которую вынесены модели (``blog.routers``).
+
+Посты и пользователи, на которых ссылаются внешние ключи вынесенных
+комментариев, остаются в основной базе, поэтому проверка внешних ключей
+здесь выключена. Каскадное удаление таких комментариев выполняют
+сигналы ``blog.signals``.
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        connection.execute('PRAGMA foreign_keys = OFF')
+        return connection
+
+    def enable_constraint_checking(self):
+        # Миграции включают проверку обратно после перестройки таблиц.
+        pass
+
+    def check_constraints(self, table_names=None):
+        pass
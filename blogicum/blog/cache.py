@@ -0,0 +1,131 @@
+"""Кэш страниц и фрагментов блога.
+
+Ключ страницы для анонимных читателей строится из адреса, номера
+страницы (или курсора), интервала часов видимости и поколений её
+областей. Поколение — время последнего изменения области в
+наносекундах. Сигналы моделей обновляют поколения затронутых областей,
+и старые ключи больше не используются.
+
+Карточки постов кэшируются по версии — хэшу всех выводимых в карточке
+данных поста, его категории, местоположения и автора.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .models import Post
+from .utils import visibility_bucket
+
+GLOBAL_SCOPE = 'global'
+INDEX_SCOPE = 'index'
+PAGE_PARAMS = ('page', 'after', 'before')
+
+
+def get_page_cache():
+    return caches[settings.BLOG_PAGE_CACHE_ALIAS]
+
+
+def post_scope(post_id):
+    return f'post:{post_id}'
+
+
+def category_scope(slug):
+    return f'category:{slug}'
+
+
+def author_scope(username):
+    return f'author:{username}'
+
+
+def post_cache_scopes(post_id):
+    """Области кэша страниц, на которых виден пост."""
+    scopes = [INDEX_SCOPE, post_scope(post_id)]
+    row = Post.objects.filter(pk=post_id).values_list(
+        'category__slug', 'author__username'
+    ).first()
+    if row is not None:
+        slug, username = row
+        scopes += [category_scope(slug), author_scope(username)]
+    return scopes
+
+
+def _generation_key(scope):
+    return f'blog:gen:{scope}'
+
+
+def get_generations(scopes):
+    cache = get_page_cache()
+    keys = [_generation_key(scope) for scope in scopes]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            # Начальное значение не должно повторять поколение,
+            # вытесненное из кэша вместе со старыми страницами.
+            cache.add(key, time.time_ns(), timeout=None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def _bump(scopes):
+    cache = get_page_cache()
+    keys = [_generation_key(scope) for scope in scopes]
+    generations = cache.get_many(keys)
+    now = time.time_ns()
+    cache.set_many(
+        {key: max(now, generations.get(key, 0) + 1) for key in keys},
+        timeout=None,
+    )
+
+
+def bump_scopes(*scopes):
+    """Сбрасывает страницы областей сразу и ещё раз после коммита.
+
+    Повторный сброс отбрасывает страницы, отрисованные другими
+    запросами до фиксации транзакции.
+    """
+    scopes = {scope for scope in scopes if scope}
+    _bump(scopes)
+    transaction.on_commit(lambda: _bump(scopes))
+
+
+def scopes_changed_at(scopes):
+    """Время последнего изменения областей, Unix-время в наносекундах."""
+    return max(get_generations([GLOBAL_SCOPE, *scopes]))
+
+
+def page_cache_key(request, scopes):
+    params = '&'.join(
+        f'{name}={request.GET[name]}'
+        for name in PAGE_PARAMS if name in request.GET
+    )
+    generations = get_generations([GLOBAL_SCOPE, *scopes])
+    raw = '|'.join(
+        map(str, (request.path, params, visibility_bucket(), *generations))
+    )
+    return 'blog:page:' + hashlib.md5(raw.encode()).hexdigest()
+
+
+def get_card_cache():
+    return caches[settings.BLOG_CARD_CACHE_ALIAS]
+
+
+def post_card_version(post):
+    """Версия карточки; меняется при любом изменении выводимых данных."""
+    category = post.category
+    location = post.location
+    parts = (
+        post.title, post.text, post.pub_date.isoformat(), post.is_published,
+        post.image.name, post.image_width, post.image_height,
+        post.renditions_ready,
+        post.comment_count, post.author.username,
+        category and (category.slug, category.title, category.is_published),
+        location and (location.name, location.is_published),
+    )
+    return hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def post_card_key(post):
+    return f'blog:card:{post.pk}:{post_card_version(post)}'
@@ -0,0 +1,226 @@
+"""Отложенная запись комментариев пачками.
+
+При всплеске комментариев каждая отдельная транзакция ждёт блокировку
+записи SQLite. Если задан ``BLOG_COMMENT_QUEUE``, проверенные формой
+комментарии дописываются строкой JSON в файл очереди (с fsync),
+а команда ``flush_comments`` забирает накопившееся и вставляет одним
+``bulk_create`` в одной транзакции.
+
+Файл забирается переименованием под блокировкой ``flock``; писатель
+после получения блокировки сверяет inode, поэтому строки не теряются.
+У каждой записи свой ``queue_id``: если процесс упадёт между вставкой
+и удалением забранного файла, при перезапуске уже записанные
+комментарии пропускаются.
+"""
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import router, transaction
+from django.db.models import F
+from django.utils.dateparse import parse_datetime
+
+from .cache import bump_scopes, post_cache_scopes, post_scope
+from .models import Comment, Post, User
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+FLUSHING_SUFFIX = '.flushing'
+
+# Разобранные файлы очереди этого процесса: путь -> _PendingIndex.
+_pending = {}
+_pending_lock = threading.Lock()
+
+
+def queue_enabled():
+    if not settings.BLOG_COMMENT_QUEUE:
+        return False
+    if fcntl is None:
+        raise ImproperlyConfigured(
+            'Очередь комментариев работает только в POSIX-системах.'
+        )
+    return True
+
+
+def _open_locked(path, lock):
+    """Открывает файл очереди и блокирует его, пока путь ведёт к нему."""
+    while True:
+        queue_file = open(path, 'a+', encoding='utf-8')
+        fcntl.flock(queue_file, lock)
+        try:
+            if os.fstat(queue_file.fileno()).st_ino == os.stat(path).st_ino:
+                return queue_file
+        except FileNotFoundError:
+            pass
+        # Файл успели забрать на запись в базу: открываем новый.
+        queue_file.close()
+
+
+def enqueue(comment):
+    """Ставит несохранённый комментарий в очередь."""
+    record = {
+        'queue_id': uuid.uuid4().hex,
+        'post_id': comment.post_id,
+        'author_id': comment.author_id,
+        'text': comment.text,
+        'created_at': comment.created_at.isoformat(),
+    }
+    with _open_locked(settings.BLOG_COMMENT_QUEUE, fcntl.LOCK_EX) as queue:
+        queue.write(json.dumps(record, ensure_ascii=False) + '\n')
+        queue.flush()
+        os.fsync(queue.fileno())
+    # Страница поста у автора не должна прийти из кэша браузера (304).
+    bump_scopes(post_scope(comment.post_id))
+
+
+def _comment(record):
+    record = dict(record)
+    record['created_at'] = parse_datetime(record['created_at'])
+    if record.get('queue_id'):
+        record['queue_id'] = uuid.UUID(record['queue_id'])
+    return Comment(**record)
+
+
+def _records(lines):
+    for line in lines:
+        # Недописанная последняя строка после сбоя пропускается.
+        try:
+            yield json.loads(line)
+        except ValueError:
+            continue
+
+
+def _read(queue_file):
+    queue_file.seek(0)
+    return [_comment(record) for record in _records(queue_file)]
+
+
+class _PendingIndex:
+    """Уже прочитанная часть файла очереди, записи по (пост, автор)."""
+
+    def __init__(self, inode, head):
+        self.inode = inode
+        self.head = head
+        self.offset = 0
+        self.records = defaultdict(list)
+
+    def update(self, queue_file):
+        """Дочитывает дописанные в конец файла строки."""
+        queue_file.seek(self.offset)
+        tail = queue_file.read()
+        # Строку, которую писатель ещё не закончил, дочитаем в следующий раз.
+        end = tail.rfind(b'\n') + 1
+        for record in _records(tail[:end].splitlines()):
+            self.records[record['post_id'], record['author_id']].append(
+                record
+            )
+        self.offset += end
+
+
+def _pending_index(path):
+    try:
+        queue_file = open(path, 'rb')
+    except FileNotFoundError:
+        return None
+    with queue_file:
+        inode = os.fstat(queue_file.fileno()).st_ino
+        head = queue_file.readline()
+        index = _pending.get(path)
+        # После забора файла на том же месте появляется новый, возможно
+        # с тем же номером inode, но с другой первой записью.
+        if index is None or (index.inode, index.head) != (inode, head):
+            index = _pending[path] = _PendingIndex(inode, head)
+        index.update(queue_file)
+    return index
+
+
+def pending_comments(post, author):
+    """Ещё не записанные в базу комментарии автора к посту.
+
+    Файлы очереди только дописываются, поэтому при каждом вызове
+    читаются лишь новые строки, а записи ищутся по (пост, автор).
+    """
+    path = settings.BLOG_COMMENT_QUEUE
+    paths = glob.glob(glob.escape(path) + '.*' + FLUSHING_SUFFIX) + [path]
+    records = []
+    with _pending_lock:
+        for stale in set(_pending) - set(paths):
+            del _pending[stale]
+        for queue_path in paths:
+            index = _pending_index(queue_path)
+            if index is None:
+                _pending.pop(queue_path, None)
+                continue
+            records += index.records.get((post.pk, author.pk), [])
+    comments = [_comment(record) for record in records]
+    for comment in comments:
+        comment.post = post
+        comment.author = author
+    return sorted(comments, key=lambda comment: comment.created_at)
+
+
+def _take():
+    """Переименовывает файл очереди, чтобы новые записи шли в новый."""
+    path = settings.BLOG_COMMENT_QUEUE
+    if not os.path.exists(path):
+        return None
+    with _open_locked(path, fcntl.LOCK_EX) as queue_file:
+        if not os.fstat(queue_file.fileno()).st_size:
+            return None
+        taken = f'{path}.{time.time_ns()}{FLUSHING_SUFFIX}'
+        os.rename(path, taken)
+    return taken
+
+
+def flush():
+    """Записывает в базу всё из очереди; возвращает число комментариев."""
+    path = settings.BLOG_COMMENT_QUEUE
+    taken = sorted(glob.glob(glob.escape(path) + '.*' + FLUSHING_SUFFIX))
+    new = _take()
+    if new:
+        taken.append(new)
+    written = 0
+    for taken_path in taken:
+        with open(taken_path, encoding='utf-8') as queue_file:
+            comments = _read(queue_file)
+        with transaction.atomic(using=router.db_for_write(Comment)), \
+                transaction.atomic():
+            # Файл могли записать перед сбоем, не успев его удалить.
+            written_ids = set(Comment.objects.filter(
+                queue_id__in=[comment.queue_id for comment in comments]
+            ).values_list('queue_id', flat=True))
+            # Посты и авторов могли удалить, пока комментарии ждали
+            # в очереди.
+            posts = set(Post.objects.filter(
+                pk__in={comment.post_id for comment in comments}
+            ).values_list('pk', flat=True))
+            authors = set(User.objects.filter(
+                pk__in={comment.author_id for comment in comments}
+            ).values_list('pk', flat=True))
+            comments = [
+                comment for comment in comments
+                if comment.queue_id not in written_ids
+                and comment.post_id in posts
+                and comment.author_id in authors
+            ]
+            Comment.objects.bulk_create(comments)
+            # bulk_create не отправляет post_save: счётчики и кэш страниц
+            # обновляются здесь, по одному запросу на пост.
+            counts = Counter(comment.post_id for comment in comments)
+            for post_id, count in counts.items():
+                Post.objects.filter(pk=post_id).update(
+                    comment_count=F('comment_count') + count
+                )
+                bump_scopes(*post_cache_scopes(post_id))
+        os.remove(taken_path)
+        written += len(comments)
+    return written
@@ -1,6 +1,8 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
 from django.utils import timezone
 
+from .images import normalize_upload, set_image_metadata
 from .models import Comment, Post
 
 
@@ -28,6 +30,17 @@ class CreatePostForm(forms.ModelForm):
             'is_published',
         )
 
+    def clean_image(self):
+        image = self.cleaned_data['image']
+        if isinstance(image, UploadedFile):
+            return normalize_upload(image)
+        return image
+
+    def save(self, commit=True):
+        if 'image' in self.changed_data:
+            set_image_metadata(self.instance, self.cleaned_data['image'])
+        return super().save(commit)
+
 
 class CreateCommentForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,202 @@
+"""Уменьшенные копии (варианты) изображений публикаций.
+
+Варианты шириной ``BLOG_IMAGE_WIDTHS`` в форматах WebP и JPEG хранятся
+рядом с оригиналом: ``img/photo.jpg`` -> ``img/photo.w640.webp``.
+Изображение не увеличивается, поэтому варианты шире оригинала
+не создаются.
+"""
+import hashlib
+import os
+import re
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import UploadedFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+RENDITION_FORMATS = {
+    'webp': 'WEBP',
+    'jpeg': 'JPEG',
+}
+RENDITION_NAME = re.compile(
+    r'^(?P<root>.+)\.w\d+\.(?:%s)$' % '|'.join(RENDITION_FORMATS)
+)
+# Файл не разбирается как изображение: повтор обработки не поможет.
+UNREADABLE_IMAGE_ERRORS = (
+    UnidentifiedImageError, Image.DecompressionBombError, SyntaxError,
+)
+# Все ошибки обработки файла, включая ошибки чтения и записи.
+IMAGE_ERRORS = (*UNREADABLE_IMAGE_ERRORS, OSError)
+
+
+def rendition_widths(width):
+    return [size for size in settings.BLOG_IMAGE_WIDTHS if size < width]
+
+
+def rendition_name(name, width, extension):
+    root, _ = os.path.splitext(name)
+    return f'{root}.w{width}.{extension}'
+
+
+def rendition_root(name):
+    """Имя оригинала без расширения, если ``name`` — вариант, иначе None."""
+    match = RENDITION_NAME.match(name)
+    return match and match['root']
+
+
+def rendition_names(name, width=None):
+    """Имена вариантов изображения; без ширины — все возможные."""
+    widths = (
+        settings.BLOG_IMAGE_WIDTHS if width is None
+        else rendition_widths(width)
+    )
+    return [
+        rendition_name(name, size, extension)
+        for size in widths
+        for extension in RENDITION_FORMATS
+    ]
+
+
+def generate_renditions(name, storage):
+    """Создаёт варианты изображения ``name`` в хранилище ``storage``."""
+    with storage.open(name, 'rb') as source_file:
+        with Image.open(source_file) as source:
+            source = source.convert('RGB')
+    # Хранилище по хэшу переименовало бы варианты оригиналов с обычными
+    # именами, а шаблоны ищут их по имени оригинала.
+    save = getattr(storage, 'save_exact', storage.save)
+    for width in rendition_widths(source.width):
+        height = round(source.height * width / source.width)
+        resized = source.resize((width, height), Image.LANCZOS)
+        for extension, image_format in RENDITION_FORMATS.items():
+            buffer = BytesIO()
+            resized.save(
+                buffer, image_format, quality=settings.BLOG_IMAGE_QUALITY
+            )
+            rendition = rendition_name(name, width, extension)
+            storage.delete(rendition)
+            save(rendition, ContentFile(buffer.getvalue()))
+
+
+def delete_renditions(name, storage):
+    for rendition in rendition_names(name):
+        storage.delete(rendition)
+
+
+def rendition_srcset(image, width, extension):
+    return ', '.join(
+        f'{image.storage.url(rendition_name(image.name, size, extension))} '
+        f'{size}w'
+        for size in rendition_widths(width)
+    )
+
+
+def read_image_metadata(image_file):
+    """Размеры, объём и SHA-256 файла изображения.
+
+    Размеры берутся из уже разобранного формой изображения, а если его
+    нет — из заголовка файла, без декодирования пикселей.
+    """
+    parsed = getattr(image_file, 'image', None)
+    if parsed is not None:
+        width, height = parsed.size
+    else:
+        image_file.seek(0)
+        with Image.open(image_file) as source:
+            width, height = source.size
+    digest = hashlib.sha256()
+    image_file.seek(0)
+    for chunk in image_file.chunks():
+        digest.update(chunk)
+    image_file.seek(0)
+    return {
+        'image_width': width,
+        'image_height': height,
+        'image_bytes': image_file.size,
+        'image_hash': digest.hexdigest(),
+    }
+
+
+def set_image_metadata(post, image_file):
+    """Заполняет сохранённые на посте сведения об изображении."""
+    if image_file:
+        metadata = read_image_metadata(image_file)
+    else:
+        metadata = dict.fromkeys(
+            ('image_width', 'image_height', 'image_bytes')
+        )
+        metadata['image_hash'] = ''
+    for field, value in metadata.items():
+        setattr(post, field, value)
+
+
+def _open_upload(upload):
+    # Файл на диске Pillow читает по мере надобности, не целиком.
+    if hasattr(upload, 'temporary_file_path'):
+        return Image.open(upload.temporary_file_path())
+    upload.seek(0)
+    return Image.open(upload)
+
+
+def normalize_upload(upload):
+    """Приводит загруженное изображение к формату хранения.
+
+    Уменьшает до ``BLOG_UPLOAD_MAX_SIDE`` по большей стороне, поворачивает
+    по EXIF, удаляет метаданные и пережимает с качеством
+    ``BLOG_UPLOAD_QUALITY``. Слишком большие по числу пикселей
+    изображения отклоняются до декодирования.
+    """
+    max_side = settings.BLOG_UPLOAD_MAX_SIDE
+    with _open_upload(upload) as source:
+        width, height = source.size
+        if width * height > settings.BLOG_UPLOAD_MAX_PIXELS:
+            raise ValidationError(
+                'Изображение слишком большое: %(width)s×%(height)s.',
+                code='image_too_large',
+                params={'width': width, 'height': height},
+            )
+        if getattr(source, 'n_frames', 1) > 1:
+            # Анимацию не пережимаем, чтобы не потерять кадры.
+            return upload
+        # Для JPEG декодер сразу уменьшает изображение в 2–8 раз.
+        source.draft('RGB', (max_side, max_side))
+        image = ImageOps.exif_transpose(source)
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+        icc_profile = source.info.get('icc_profile')
+
+    has_alpha = image.mode in ('RGBA', 'LA') or (
+        image.mode == 'P' and 'transparency' in image.info
+    )
+    if has_alpha:
+        image_format, extension, content_type = 'PNG', 'png', 'image/png'
+        image = image.convert('RGBA')
+        options = {'optimize': True}
+    else:
+        image_format, extension, content_type = 'JPEG', 'jpg', 'image/jpeg'
+        image = image.convert('RGB')
+        options = {
+            'quality': settings.BLOG_UPLOAD_QUALITY,
+            'optimize': True,
+            'progressive': True,
+        }
+    if icc_profile:
+        options['icc_profile'] = icc_profile
+
+    output = tempfile.SpooledTemporaryFile(
+        max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+    )
+    image.save(output, image_format, **options)
+    size = output.tell()
+    output.seek(0)
+    root, _ = os.path.splitext(os.path.basename(upload.name))
+    normalized = UploadedFile(
+        output,
+        name=f'{root}.{extension}',
+        content_type=content_type,
+        size=size,
+    )
+    normalized.image = image
+    return normalized
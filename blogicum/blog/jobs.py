@@ -0,0 +1,56 @@
+"""Очередь фоновой обработки изображений в таблице ImageJob.
+
+Задания забирает один управляющий процесс (команда
+``process_image_jobs``) и раздаёт их пулу процессов. Сам пул с базой
+данных не работает — только с файлами в хранилище.
+"""
+from django.conf import settings
+from django.db import transaction
+
+from .cache import bump_scopes, post_cache_scopes
+from .images import UNREADABLE_IMAGE_ERRORS, generate_renditions
+from .models import ImageJob, Post
+
+
+def render_image(image_name):
+    """Выполняется в процессе пула."""
+    storage = Post._meta.get_field('image').storage
+    generate_renditions(image_name, storage)
+
+
+def requeue_interrupted_jobs():
+    return ImageJob.objects.filter(
+        status=ImageJob.Status.RUNNING
+    ).update(status=ImageJob.Status.PENDING)
+
+
+def claim_jobs(limit):
+    with transaction.atomic():
+        ids = list(ImageJob.objects.filter(
+            status=ImageJob.Status.PENDING
+        ).values_list('pk', flat=True)[:limit])
+        ImageJob.objects.filter(
+            pk__in=ids, status=ImageJob.Status.PENDING
+        ).update(status=ImageJob.Status.RUNNING)
+    return list(ImageJob.objects.filter(pk__in=ids))
+
+
+def finish_job(job, error=None):
+    if error is None:
+        job.status = ImageJob.Status.DONE
+        job.error = ''
+        # Пока задание ждало, изображение поста могло смениться.
+        if Post.objects.filter(
+            pk=job.post_id, image=job.image_name
+        ).update(renditions_ready=True):
+            bump_scopes(*post_cache_scopes(job.post_id))
+    else:
+        job.attempts += 1
+        job.error = f'{type(error).__name__}: {error}'
+        job.status = (
+            ImageJob.Status.FAILED
+            if job.attempts >= settings.BLOG_IMAGE_JOB_ATTEMPTS
+            or isinstance(error, UNREADABLE_IMAGE_ERRORS)
+            else ImageJob.Status.PENDING
+        )
+    job.save(update_fields=('status', 'attempts', 'error'))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import set_image_metadata
+from blog.models import Post
+
+METADATA_FIELDS = ('image_width', 'image_height', 'image_bytes', 'image_hash')
+
+
+class Command(BaseCommand):
+    help = 'Заполняет размеры, объём и хэш изображений публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько публикаций обновлять одним запросом.',
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересчитать и уже заполненные публикации.',
+        )
+
+    def handle(self, *args, batch_size, **options):
+        posts = Post.objects.exclude(image='').only('pk', 'image')
+        if not options['all']:
+            posts = posts.filter(image_width__isnull=True)
+        batch = []
+        done = 0
+        for post in posts.iterator(chunk_size=batch_size):
+            try:
+                with post.image.open('rb') as image_file:
+                    set_image_metadata(post, image_file)
+            except OSError as error:
+                self.stderr.write(f'{post.image.name}: {error}')
+                continue
+            batch.append(post)
+            if len(batch) >= batch_size:
+                done += Post.objects.bulk_update(batch, METADATA_FIELDS)
+                batch = []
+        done += Post.objects.bulk_update(batch, METADATA_FIELDS)
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено публикаций: {done}')
+        )
@@ -0,0 +1,116 @@
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.comment_queue import enqueue, flush
+from blog.models import Comment, Post, User
+from blogicum.warmup import used_aliases
+
+
+def write_comments(mode, post_id, author_id, count):
+    """Пишет комментарии в процессе-воркере, возвращает задержки в мс."""
+    post = Post.objects.get(pk=post_id)
+    author = User.objects.get(pk=author_id)
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        comment = Comment(
+            post=post, author=author, text='Комментарий',
+            created_at=timezone.now(),
+        )
+        if mode == 'queue':
+            enqueue(comment)
+        else:
+            comment.save()
+        latencies.append((time.perf_counter() - started) * 1000)
+    connections.close_all()
+    return latencies
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает запись комментариев из нескольких процессов: каждый '
+        'своей транзакцией и через очередь flush_comments. Замер идёт на '
+        'временных копиях баз, рабочие данные не затрагиваются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8)
+        parser.add_argument(
+            '--comments', type=int, default=200,
+            help='Комментариев на каждый процесс.',
+        )
+
+    def handle(self, *args, workers, comments, **options):
+        for mode in ('direct', 'queue'):
+            with tempfile.TemporaryDirectory() as directory:
+                databases = self.create_databases(directory)
+                try:
+                    author = User.objects.create(username='benchmark')
+                    post = Post.objects.create(
+                        author=author, title='Пост', text='Текст',
+                        pub_date=timezone.now(),
+                    )
+                    with override_settings(BLOG_COMMENT_QUEUE=os.path.join(
+                        directory, 'comments.jsonl'
+                    )):
+                        self.run(mode, workers, comments, post.pk, author.pk)
+                    assert Comment.objects.filter(post=post).count() == (
+                        workers * comments
+                    )
+                finally:
+                    for connection, old_name in databases:
+                        connection.creation.destroy_test_db(
+                            old_name, verbosity=0
+                        )
+
+    def create_databases(self, directory):
+        """Создаёт и мигрирует временные файлы баз, как тестовый раннер."""
+        databases = []
+        for alias in used_aliases():
+            connection = connections[alias]
+            connection.settings_dict['TEST']['NAME'] = os.path.join(
+                directory, f'{alias}.sqlite3'
+            )
+            databases.append((
+                connection, connection.settings_dict['NAME']
+            ))
+            connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+        return databases
+
+    def run(self, mode, workers, comments, post_id, author_id):
+        # Соединения SQLite нельзя переносить в дочерние процессы.
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        started = time.perf_counter()
+        with context.Pool(workers) as pool:
+            result = pool.starmap_async(
+                write_comments,
+                [(mode, post_id, author_id, comments)] * workers,
+            )
+            while not result.ready():
+                if mode == 'queue':
+                    flush()
+                time.sleep(0.01)
+            latencies = sorted(
+                latency for chunk in result.get() for latency in chunk
+            )
+        if mode == 'queue':
+            flush()
+        elapsed = time.perf_counter() - started
+        total = workers * comments
+        self.stdout.write(
+            f'{mode}: {total / elapsed:.0f} комментариев/с до записи '
+            f'в базу, задержка запроса p50 '
+            f'{statistics.median(latencies):.2f} мс, p99 '
+            f'{latencies[int(len(latencies) * 0.99)]:.2f} мс'
+        )
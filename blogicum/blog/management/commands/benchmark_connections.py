@@ -0,0 +1,83 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import Client, RequestFactory
+
+from blogicum.warmup import used_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время запроса с подключением к базам на каждый '
+        'запрос (CONN_MAX_AGE=0) и с постоянными соединениями.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument(
+            '--username',
+            help=(
+                'Запрашивать страницы от имени пользователя: анонимам '
+                'они отдаются из кэша страниц без обращения к базе.'
+            ),
+        )
+        parser.add_argument(
+            '--conn-max-age', type=int, default=600,
+            help='CONN_MAX_AGE для постоянных соединений.',
+        )
+
+    def handle(
+        self, *args, path, requests, username, conn_max_age, **options
+    ):
+        # Обработчик WSGI, а не тестовый клиент: клиент отключает
+        # закрытие соединений по сигналам начала и конца запроса.
+        handler = WSGIHandler()
+        headers = {
+            'HTTP_HOST': settings.ALLOWED_HOSTS[0].lstrip('.*') or 'localhost'
+        }
+        if username:
+            client = Client()
+            client.force_login(
+                get_user_model().objects.get(username=username)
+            )
+            headers['HTTP_COOKIE'] = client.cookies.output(
+                header='', sep=';'
+            ).strip()
+        factory = RequestFactory(**headers)
+        for max_age in (0, conn_max_age):
+            for alias in used_aliases():
+                connections[alias].close()
+                connections[alias].settings_dict['CONN_MAX_AGE'] = max_age
+            opened = []
+
+            def count(sender, connection, **kwargs):
+                opened.append(connection.alias)
+
+            connection_created.connect(count)
+            try:
+                # Первый запрос прогревает кэши шаблонов и URL.
+                self.request(handler, factory, path)
+                opened.clear()
+                started = time.perf_counter()
+                for _ in range(requests):
+                    self.request(handler, factory, path)
+                elapsed = time.perf_counter() - started
+            finally:
+                connection_created.disconnect(count)
+            self.stdout.write(
+                f'CONN_MAX_AGE={max_age}: '
+                f'{elapsed / requests * 1000:.2f} мс на запрос, '
+                f'подключений: {len(opened)}'
+            )
+
+    def request(self, handler, factory, path):
+        response = handler(factory.get(path).environ, lambda *args: None)
+        for _ in response:
+            pass
+        response.close()
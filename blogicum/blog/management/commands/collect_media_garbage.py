@@ -0,0 +1,143 @@
+import os
+import shutil
+import time
+from functools import reduce
+from operator import or_
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from blog.images import rendition_root
+from blog.models import Post
+
+# Глубина выражения в SQLite ограничена, поэтому условия по корням
+# имён вариантов собираются небольшими пачками.
+ROOTS_PER_QUERY = 100
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет из каталога изображений файлы, на которые не ссылается '
+        'ни одна публикация, вместе с их вариантами.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours', type=float, default=24,
+            help='Не трогать файлы моложе указанного числа часов.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=500,
+            help='Сколько файлов проверять одним запросом.',
+        )
+        parser.add_argument(
+            '--quarantine',
+            help='Переносить файлы в этот каталог вместо удаления.',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только вывести найденные файлы.',
+        )
+
+    def handle(self, *args, grace_hours, chunk_size, **options):
+        field = Post._meta.get_field('image')
+        self.storage = field.storage
+        self.upload_to = field.upload_to.rstrip('/')
+        self.quarantine = options['quarantine']
+        self.dry_run = options['dry_run']
+        if self.quarantine and not self.dry_run:
+            quarantine = os.path.realpath(self.quarantine)
+            top = os.path.realpath(self.storage.path(self.upload_to))
+            if os.path.commonpath([quarantine, top]) == top:
+                raise CommandError(
+                    'Карантин не может находиться в каталоге изображений.'
+                )
+        self.cutoff = cutoff = time.time() - grace_hours * 3600
+        found = size = 0
+        chunk = []
+        for entry in self.walk(self.storage.path(self.upload_to)):
+            stat = entry.stat()
+            if stat.st_mtime > cutoff:
+                continue
+            chunk.append((self.storage_name(entry.path), stat.st_size))
+            if len(chunk) >= chunk_size:
+                found, size = self.collect(chunk, found, size)
+                chunk = []
+        found, size = self.collect(chunk, found, size)
+        verb = 'Найдено' if self.dry_run else 'Убрано'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} файлов без ссылок: {found}, байт: {size}'
+        ))
+
+    def walk(self, top):
+        """Обходит дерево каталогов без построения полного списка файлов."""
+        directories = [top]
+        while directories:
+            try:
+                entries = os.scandir(directories.pop())
+            except FileNotFoundError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry
+
+    def storage_name(self, path):
+        return os.path.relpath(path, self.storage.location).replace(
+            os.sep, '/'
+        )
+
+    def collect(self, chunk, found, size):
+        for name, file_size in self.orphans(chunk):
+            if self.dry_run:
+                self.stdout.write(name)
+            elif not self.remove(name):
+                continue
+            found += 1
+            size += file_size
+        return found, size
+
+    def remove(self, name):
+        # Под блокировкой хранилища: повторная загрузка того же файла
+        # обновляет mtime, и такой файл больше не считается брошенным.
+        with self.storage.lock():
+            if not self.storage.is_stale(name, self.cutoff):
+                return False
+            if self.quarantine:
+                target = os.path.join(self.quarantine, name)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.move(self.storage.path(name), target)
+            else:
+                self.storage.delete(name)
+        return True
+
+    def orphans(self, chunk):
+        """Файлы пачки, на которые и на чьи оригиналы нет ссылок."""
+        referenced = set(
+            Post.objects.filter(image__in=[name for name, _ in chunk])
+            .values_list('image', flat=True)
+        )
+        roots = sorted({
+            rendition_root(name) for name, _ in chunk
+        } - {None})
+        referenced_roots = set()
+        for start in range(0, len(roots), ROOTS_PER_QUERY):
+            # Диапазон [root., root/) попадает в индекс по image, в отличие
+            # от LIKE, который в SQLite не учитывает регистр.
+            condition = reduce(or_, (
+                Q(image__gte=f'{root}.', image__lt=f'{root}/')
+                for root in roots[start:start + ROOTS_PER_QUERY]
+            ))
+            referenced_roots.update(
+                os.path.splitext(name)[0]
+                for name in Post.objects.filter(condition)
+                .values_list('image', flat=True)
+            )
+        for name, file_size in chunk:
+            if name in referenced:
+                continue
+            root = rendition_root(name)
+            if root is None or root not in referenced_roots:
+                yield name, file_size
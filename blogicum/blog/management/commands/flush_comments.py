@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.comment_queue import flush
+
+
+class Command(BaseCommand):
+    help = 'Записывает в базу пачками комментарии из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0.01,
+            help='Пауза между записями пачек, секунды.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Записать накопившиеся комментарии и завершиться.',
+        )
+
+    def handle(self, *args, interval, once, **options):
+        if not settings.BLOG_COMMENT_QUEUE:
+            raise CommandError('Очередь комментариев не настроена.')
+        written = 0
+        while True:
+            written += flush()
+            if once:
+                break
+            time.sleep(interval)
+        self.stdout.write(
+            self.style.SUCCESS(f'Записано комментариев: {written}')
+        )
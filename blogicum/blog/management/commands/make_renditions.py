@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import IMAGE_ERRORS, generate_renditions
+from blog.jobs import finish_job
+from blog.models import ImageJob, Post
+
+
+class Command(BaseCommand):
+    help = 'Создаёт копии изображений публикаций сразу, без очереди.'
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').only('pk', 'image')
+        done = failed = 0
+        for post in posts.iterator():
+            name = post.image.name
+            try:
+                generate_renditions(name, post.image.storage)
+            except IMAGE_ERRORS as error:
+                # Ошибка сохраняется в задании, как у process_image_jobs.
+                job = post.image_jobs.filter(
+                    image_name=name
+                ).exclude(status=ImageJob.Status.DONE).first()
+                if job is None:
+                    job = ImageJob.objects.create(
+                        post=post, image_name=name,
+                        status=ImageJob.Status.RUNNING,
+                    )
+                finish_job(job, error)
+                self.stderr.write(f'{name}: {job.error}')
+                failed += 1
+                continue
+            Post.objects.filter(
+                pk=post.pk, image=name
+            ).update(renditions_ready=True)
+            done += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано изображений: {done}, с ошибкой: {failed}'
+        ))
@@ -0,0 +1,51 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+
+from blog.jobs import (claim_jobs, finish_job, render_image,
+                       requeue_interrupted_jobs)
+
+
+class Command(BaseCommand):
+    help = 'Обрабатывает очередь изображений публикаций в пуле процессов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Число процессов пула; по умолчанию — число ядер.',
+        )
+        parser.add_argument(
+            '--poll', type=float, default=2.0,
+            help='Пауза между проверками пустой очереди, секунды.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать накопившиеся задания и завершиться.',
+        )
+
+    def handle(self, *args, workers, poll, once, **options):
+        requeue_interrupted_jobs()
+        processed = 0
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=django.setup
+        ) as pool:
+            while True:
+                jobs = claim_jobs(workers * 2)
+                if not jobs:
+                    if once:
+                        break
+                    time.sleep(poll)
+                    continue
+                futures = {
+                    pool.submit(render_image, job.image_name): job
+                    for job in jobs
+                }
+                for future in as_completed(futures):
+                    finish_job(futures[future], future.exception())
+                    processed += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Обработано заданий: {processed}')
+        )
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, Post
+from blog.routers import same_database
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённое число комментариев у публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько публикаций обновлять одним запросом, если '
+                 'комментарии хранятся в отдельной базе.',
+        )
+
+    def handle(self, *args, batch_size, **options):
+        counts = Comment.objects.order_by().values('post').annotate(
+            total=Count('pk')
+        )
+        if same_database(Comment, Post):
+            updated = Post.objects.update(comment_count=Coalesce(
+                Subquery(counts.filter(post=OuterRef('pk')).values('total')),
+                0,
+            ))
+        else:
+            # Подзапрос в другую базу невозможен: считаем по базе
+            # комментариев и записываем пачками.
+            with transaction.atomic():
+                updated = Post.objects.update(comment_count=0)
+                Post.objects.bulk_update(
+                    (
+                        Post(pk=row['post'], comment_count=row['total'])
+                        for row in counts.iterator()
+                    ),
+                    ['comment_count'],
+                    batch_size=batch_size,
+                )
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено публикаций: {updated}')
+        )
@@ -0,0 +1,24 @@
+from django.conf import settings
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+class ReadYourWritesMiddleware:
+    """Отмечает cookie тех, кто только что изменял данные.
+
+    Пока cookie жива, ``ReplicaReadMixin`` читает для них из основной
+    базы, а не из снимка, где их изменений может ещё не быть.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if settings.BLOG_READ_REPLICA and request.method not in SAFE_METHODS:
+            response.set_cookie(
+                settings.BLOG_REPLICA_STICKY_COOKIE, '1',
+                max_age=settings.BLOG_REPLICA_STICKY_SECONDS,
+                httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:17
+
+import blog.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_image_jobs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, storage=blog.storage.select_image_storage, upload_to='img/', verbose_name='Изображение'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:19
+
+import blog.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_content_addressed_images'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, db_index=True, storage=blog.storage.select_image_storage, upload_to='img/', verbose_name='Изображение'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 04:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_index_post_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='queue_id',
+            field=models.UUIDField(editable=False, null=True, unique=True, verbose_name='Ключ в очереди'),
+        ),
+    ]
@@ -1,6 +1,46 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.shortcuts import redirect
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
 
+from .cache import get_page_cache, page_cache_key, scopes_changed_at
 from .models import Comment, Post
+from .paginators import paginate_by_keyset
+from .routers import read_from_replica, replica_available
+from .utils import visibility_bucket
+
+
+class AuthorAccessMixin:
+    """Проверяет право на изменение объекта, загружая его один раз.
+
+    Объект выбирается вместе с ``related_fields``, кэшируется на
+    представлении и переиспользуется при проверке прав и в ответе.
+    """
+
+    related_fields = ()
+    staff_can_manage = False
+
+    def get_queryset(self):
+        return super().get_queryset().select_related(*self.related_fields)
+
+    def get_object(self, queryset=None):
+        if not hasattr(self, '_object'):
+            self._object = super().get_object(queryset)
+        return self._object
+
+    def can_manage(self, user, obj):
+        if obj.author_id == user.pk:
+            return True
+        return self.staff_can_manage and (user.is_staff or user.is_superuser)
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.can_manage(request.user, self.get_object()):
+            return redirect('blog:post_detail', post_id=self.kwargs['post_id'])
+        return super().dispatch(request, *args, **kwargs)
 
 
 class PostsEditMixin:
@@ -15,3 +55,112 @@ class CommentEditMixin:
 
     def get_success_url(self):
         return reverse('blog:post_detail', args=[self.kwargs['post_id']])
+
+
+class KeysetPaginationMixin:
+    """Включает курсорную пагинацию, если она разрешена в настройках."""
+
+    def paginate_queryset(self, queryset, page_size):
+        if not settings.BLOG_KEYSET_PAGINATION:
+            return super().paginate_queryset(queryset, page_size)
+        return paginate_by_keyset(self.request, queryset, page_size)
+
+
+class AnonymousPageCacheMixin:
+    """Отдаёт анонимным читателям сохранённую копию страницы.
+
+    Наследники перечисляют в ``get_cache_scopes`` области, при
+    изменении которых страница должна устареть.
+    """
+
+    def get_cache_scopes(self):
+        return ()
+
+    def dispatch(self, request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated):
+            return super().dispatch(request, *args, **kwargs)
+        cache = get_page_cache()
+        key = page_cache_key(request, self.get_cache_scopes())
+        response = cache.get(key)
+        if response is not None:
+            return get_conditional_response(
+                request, etag=response.get('ETag'), response=response
+            )
+        response = super().dispatch(request, *args, **kwargs)
+        if (response.status_code == 200
+                and hasattr(response, 'add_post_render_callback')):
+            response.add_post_render_callback(
+                lambda rendered: cache.set(
+                    key, rendered, settings.BLOG_PAGE_CACHE_TIMEOUT
+                )
+            )
+        return response
+
+
+class ConditionalGetMixin:
+    """Отвечает 304, если страница не изменилась с прошлого запроса.
+
+    Валидаторы строятся без отрисовки шаблона: из даты последней
+    публикации или комментария (``get_last_modified``, один агрегатный
+    запрос), времени изменения областей кэша и интервала часов
+    видимости. Если ``get_last_modified`` вернул None (объекта нет или
+    он не виден запросу), страница отрисовывается как обычно: 304 не
+    должен скрывать ответ 404.
+    """
+
+    def get_last_modified(self):
+        return None
+
+    def get_validators(self, published):
+        scopes_changed = scopes_changed_at(self.get_cache_scopes())
+        last_modified = max(
+            scopes_changed // 10 ** 9, int(published.timestamp())
+        )
+        last_modified = min(last_modified, int(time.time()))
+        raw = '|'.join(map(str, (
+            self.request.path,
+            self.request.GET.urlencode(),
+            self.request.user.pk,
+            visibility_bucket(),
+            scopes_changed,
+            last_modified,
+        )))
+        etag = quote_etag(hashlib.md5(raw.encode()).hexdigest())
+        return etag, last_modified
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        published = self.get_last_modified()
+        if published is None:
+            return super().dispatch(request, *args, **kwargs)
+        etag, last_modified = self.get_validators(published)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response.headers['ETag'] = etag
+            response.headers['Last-Modified'] = http_date(last_modified)
+            patch_vary_headers(response, ('Cookie',))
+        return response
+
+
+class ReplicaReadMixin:
+    """Читает данные страницы из снимка базы (``publish_snapshot``).
+
+    Ответ отрисовывается внутри ``read_from_replica``, чтобы ленивые
+    запросы шаблона тоже ушли в снимок. Должен стоять первым среди
+    примесей: проверка ETag и кэш страниц читают те же данные.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if not replica_available(request):
+            return super().dispatch(request, *args, **kwargs)
+        with read_from_replica():
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.render()
+        return response
@@ -2,6 +2,8 @@ from django.db import models
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
+from .storage import select_image_storage
+
 User = get_user_model()
 
 
@@ -92,13 +94,65 @@ class Post(PublishedModel, BaseTitle):
         on_delete=models.SET_NULL,
         null=True,
     )
-    image = models.ImageField('Изображение', blank=True, upload_to='img/')
+    image = models.ImageField(
+        'Изображение',
+        blank=True,
+        upload_to='img/',
+        storage=select_image_storage,
+        db_index=True,
+    )
+    image_width = models.PositiveIntegerField(
+        verbose_name='Ширина изображения',
+        null=True,
+        editable=False,
+    )
+    image_height = models.PositiveIntegerField(
+        verbose_name='Высота изображения',
+        null=True,
+        editable=False,
+    )
+    image_bytes = models.PositiveIntegerField(
+        verbose_name='Размер изображения, байт',
+        null=True,
+        editable=False,
+    )
+    image_hash = models.CharField(
+        verbose_name='SHA-256 изображения',
+        max_length=64,
+        blank=True,
+        editable=False,
+    )
+    renditions_ready = models.BooleanField(
+        verbose_name='Копии изображения готовы',
+        default=False,
+        editable=False,
+    )
+    comment_count = models.PositiveIntegerField(
+        verbose_name='Комментариев',
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
         default_related_name = 'posts'
+        indexes = (
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_published=True),
+                name='post_published_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=('category', 'pub_date'),
+                name='post_category_pub_date_idx',
+            ),
+        )
 
     def __str__(self) -> str:
         return self.title
@@ -127,11 +181,75 @@ class Comment(models.Model):
         verbose_name='Дата',
         auto_now_add=True,
     )
+    # Ключ записи в очереди комментариев (blog.comment_queue): повторная
+    # запись той же пачки после сбоя не создаёт дубликатов.
+    queue_id = models.UUIDField(
+        null=True,
+        unique=True,
+        editable=False,
+        verbose_name='Ключ в очереди',
+    )
 
     class Meta:
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_at_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:20]
+
+
+class ImageJob(models.Model):
+    """Задание фонового обработчика изображений."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        RUNNING = 'running', 'Выполняется'
+        DONE = 'done', 'Готово'
+        FAILED = 'failed', 'Ошибка'
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='Пост',
+        related_name='image_jobs',
+    )
+    image_name = models.CharField(
+        max_length=100,
+        verbose_name='Файл изображения',
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='Состояние',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток',
+    )
+    error = models.TextField(blank=True, verbose_name='Ошибка')
+    created_at = models.DateTimeField(
+        verbose_name='Добавлено',
+        auto_now_add=True,
+    )
+
+    class Meta:
+        verbose_name = 'обработка изображения'
+        verbose_name_plural = 'Обработка изображений'
+        ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('status', 'created_at'),
+                name='imagejob_status_created_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.image_name} ({self.get_status_display()})'
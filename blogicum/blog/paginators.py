@@ -0,0 +1,128 @@
+from collections.abc import Sequence
+
+from django.db.models import Q
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
+from django.utils.encoding import force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class KeysetPage(Sequence):
+    """Страница курсорной пагинации с интерфейсом, близким к Page."""
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<Keyset page of {len(self.object_list)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return self.paginator.encode_cursor(self.object_list[0])
+
+
+class KeysetPaginator:
+    """Пагинация по ключу (поле, id) без OFFSET.
+
+    Стоимость любой страницы равна стоимости первой: выборка идёт
+    диапазоном по индексу от позиции курсора.
+    """
+
+    is_keyset = True
+
+    def __init__(self, object_list, per_page, field='pub_date',
+                 descending=True):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.field = field
+        self.descending = descending
+
+    def encode_cursor(self, obj):
+        raw = f'{getattr(obj, self.field).isoformat()}|{obj.pk}'
+        return urlsafe_base64_encode(raw.encode())
+
+    @staticmethod
+    def decode_cursor(token):
+        try:
+            value, pk = force_str(urlsafe_base64_decode(token)).split('|')
+            value = parse_datetime(value)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise InvalidCursor(token)
+        if value is None:
+            raise InvalidCursor(token)
+        return value, pk
+
+    def _slice(self, token, forward):
+        value, pk = self.decode_cursor(token)
+        lookup = 'lt' if forward == self.descending else 'gt'
+        return self.object_list.filter(
+            Q(**{f'{self.field}__{lookup}': value})
+            | Q(**{self.field: value, f'pk__{lookup}': pk})
+        )
+
+    def _ordering(self, forward):
+        prefix = '-' if forward == self.descending else ''
+        return f'{prefix}{self.field}', f'{prefix}pk'
+
+    def page(self, after=None, before=None):
+        forward = not before
+        if after:
+            queryset = self._slice(after, forward=True)
+        elif before:
+            queryset = self._slice(before, forward=False)
+        else:
+            queryset = self.object_list
+        queryset = queryset.order_by(*self._ordering(forward))
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if before:
+            rows.reverse()
+            return KeysetPage(rows, self, has_next=True, has_previous=has_more)
+        return KeysetPage(
+            rows, self, has_next=has_more, has_previous=bool(after)
+        )
+
+
+def paginate_by_keyset(request, queryset, page_size, **kwargs):
+    paginator = KeysetPaginator(queryset, page_size, **kwargs)
+    try:
+        page = paginator.page(
+            after=request.GET.get('after'),
+            before=request.GET.get('before'),
+        )
+    except InvalidCursor:
+        raise Http404('Некорректный курсор страницы.')
+    return paginator, page, page.object_list, page.has_other_pages()
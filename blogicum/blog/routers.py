@@ -0,0 +1,103 @@
+"""Маршрутизация запросов между файлами SQLite.
+
+SQLite допускает одного писателя на файл, поэтому частые записи
+(комментарии, сессии) выносятся в свои базы по ``BLOG_DATABASE_ROUTES``,
+если включено ``BLOG_SPLIT_DATABASES``. Связи между базами не
+поддерживаются в SQL: соединения заменяются отдельными запросами
+(см. ``same_database``), каскадное удаление — сигналами.
+
+Чтение лент и страниц постов можно направить в снимок основной базы
+(``ReplicaRouter``, команда ``publish_snapshot``).
+"""
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, router
+
+REPLICA_DB_ALIAS = 'replica'
+
+_read_from_replica = ContextVar('read_from_replica', default=False)
+
+
+def routed_database(model):
+    """База модели (или её экземпляра), если модель вынесена."""
+    if not settings.BLOG_SPLIT_DATABASES:
+        return None
+    return settings.BLOG_DATABASE_ROUTES.get(model._meta.label_lower)
+
+
+def same_database(*models):
+    """Можно ли соединять таблицы моделей в одном запросе."""
+    return len({router.db_for_read(model) for model in models}) == 1
+
+
+class SplitDatabaseRouter:
+
+    def db_for_read(self, model, **hints):
+        database = routed_database(model)
+        if database:
+            return database
+        instance = hints.get('instance')
+        if instance is not None and routed_database(instance):
+            # Связанный объект вынесенной модели живёт в основной базе,
+            # а не в базе экземпляра, как решил бы Django по умолчанию.
+            return DEFAULT_DB_ALIAS
+        return None
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if routed_database(obj1) or routed_database(obj2):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == DEFAULT_DB_ALIAS:
+            # Таблицы остаются и в основной базе: там они используются,
+            # пока разделение выключено.
+            return None
+        return settings.BLOG_DATABASE_ROUTES.get(
+            f'{app_label}.{model_name}'
+        ) == db
+
+
+def replica_available(request):
+    """Можно ли читать для запроса из снимка.
+
+    Не для тех, кто недавно что-то менял: им нужны свои изменения,
+    которых в снимке может ещё не быть.
+    """
+    return (
+        settings.BLOG_READ_REPLICA
+        and settings.BLOG_REPLICA_STICKY_COOKIE not in request.COOKIES
+        and os.path.exists(settings.BLOG_REPLICA_SNAPSHOT)
+    )
+
+
+@contextmanager
+def read_from_replica():
+    token = _read_from_replica.set(True)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+class ReplicaRouter:
+    """Чтение моделей блога из снимка внутри ``read_from_replica``.
+
+    Пользователи и сессии всегда читаются из основной базы: в снимке
+    может не быть только что созданной сессии.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _read_from_replica.get() and model._meta.app_label == 'blog':
+            return REPLICA_DB_ALIAS
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == REPLICA_DB_ALIAS:
+            return False
+        return None
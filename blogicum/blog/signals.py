@@ -0,0 +1,253 @@
+import time
+from collections import Counter, defaultdict
+from weakref import WeakKeyDictionary
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, QuerySet
+from django.db.models.functions import Greatest
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from .cache import (GLOBAL_SCOPE, INDEX_SCOPE, bump_scopes,
+                    post_cache_scopes, post_scope)
+from .images import delete_renditions
+from .models import Category, Comment, ImageJob, Location, Post, User
+from .routers import routed_database
+
+
+# Данные сигналов по вызовам ``delete()``: ключ — объект или QuerySet,
+# у которого вызвали удаление (``origin`` сигналов).
+_deletions = WeakKeyDictionary()
+
+
+def deletion_state(origin):
+    """Общие данные сигналов одного вызова ``delete()``.
+
+    ``posts`` — удаляемые этим вызовом посты: счётчики и страницы их
+    комментариев обновлять не нужно. ``comments`` — число удаляемых
+    комментариев по постам, ``pending`` — сколько из них ещё не удалено.
+    ``invalidated`` — посты, страницы которых уже сброшены. ``global`` —
+    сбрасываются все страницы.
+    """
+    if origin is None:
+        return new_deletion_state()
+    state = _deletions.get(origin)
+    if state is None:
+        state = _deletions[origin] = new_deletion_state()
+        model = (
+            origin.model if isinstance(origin, QuerySet) else type(origin)
+        )
+        # Удаление пользователя сбрасывает глобальную область.
+        state['global'] = issubclass(model, User)
+    return state
+
+
+def new_deletion_state():
+    return {
+        'posts': set(),
+        'comments': Counter(),
+        'pending': 0,
+        'invalidated': set(),
+        'global': False,
+    }
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleted_post(sender, instance, origin=None, **kwargs):
+    state = deletion_state(origin)
+    state['posts'].add(instance.pk)
+    if not state['global']:
+        instance._old_cache_scopes = post_cache_scopes(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    if created and not kwargs.get('raw'):
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1
+        )
+
+
+def decrease_comment_counts(counts):
+    """Уменьшает счётчики: один UPDATE на группу постов с равной разницей."""
+    posts = defaultdict(list)
+    for post_id, count in counts.items():
+        posts[count].append(post_id)
+    for count, post_ids in posts.items():
+        Post.objects.filter(pk__in=post_ids).update(
+            comment_count=Greatest(F('comment_count') - count, 0)
+        )
+
+
+@receiver(pre_delete, sender=Comment)
+def remember_deleted_comment(sender, instance, origin=None, **kwargs):
+    state = deletion_state(origin)
+    state['comments'][instance.post_id] += 1
+    state['pending'] += 1
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, origin=None, **kwargs):
+    # Срабатывает и при массовом удалении через QuerySet.delete(),
+    # и при удалении вместе с постом или автором. Все pre_delete
+    # приходят до первого удаления, поэтому счётчики обновляются
+    # вместе после последнего комментария вызова.
+    if origin is None:
+        decrease_comment_counts({instance.post_id: 1})
+        return
+    state = deletion_state(origin)
+    state['pending'] -= 1
+    if state['pending']:
+        return
+    counts = state['comments']
+    state['comments'] = Counter()
+    for post_id in state['posts']:
+        counts.pop(post_id, None)
+    decrease_comment_counts(counts)
+
+
+@receiver(post_delete, sender=Post)
+def delete_post_comments(sender, instance, origin=None, **kwargs):
+    # Каскад Django удаляет комментарии только из базы поста.
+    if not routed_database(Comment):
+        return
+    comments = Comment.objects.filter(post_id=instance.pk)
+    state = deletion_state(comments)
+    state['posts'].add(instance.pk)
+    state['global'] = deletion_state(origin)['global']
+    comments.delete()
+
+
+@receiver(post_delete, sender=User)
+def delete_user_comments(sender, instance, **kwargs):
+    if not routed_database(Comment):
+        return
+    comments = Comment.objects.filter(author_id=instance.pk)
+    deletion_state(comments)['global'] = True
+    comments.delete()
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_scopes(sender, instance, raw=False, **kwargs):
+    # Пост мог сменить категорию или автора: старые страницы
+    # тоже нужно сбросить.
+    if instance.pk and not raw:
+        instance._old_cache_scopes = post_cache_scopes(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    scopes = instance.__dict__.pop('_old_cache_scopes', [])
+    # Категория и автор одним запросом, без загрузки связанных объектов.
+    bump_scopes(*scopes, *post_cache_scopes(instance.pk))
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_deleted_post_pages(sender, instance, origin=None, **kwargs):
+    if deletion_state(origin)['global']:
+        return
+    bump_scopes(
+        INDEX_SCOPE, post_scope(instance.pk),
+        *instance.__dict__.pop('_old_cache_scopes', []),
+    )
+
+
+@receiver(post_save, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    bump_scopes(*post_cache_scopes(instance.post_id))
+
+
+@receiver(post_delete, sender=Comment)
+def invalidate_deleted_comment_pages(sender, instance, origin=None,
+                                     **kwargs):
+    # Страницы поста сбрасываются один раз на вызов delete(), а не для
+    # каждого комментария.
+    state = deletion_state(origin)
+    if state['global'] or instance.post_id in (
+        state['posts'] | state['invalidated']
+    ):
+        return
+    state['invalidated'].add(instance.post_id)
+    bump_scopes(*post_cache_scopes(instance.post_id))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_all_pages(sender, **kwargs):
+    bump_scopes(GLOBAL_SCOPE)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_pages_on_user_change(sender, update_fields=None, **kwargs):
+    # Вход пользователя обновляет только last_login.
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    bump_scopes(GLOBAL_SCOPE)
+
+
+@receiver(pre_save, sender=Post)
+def reset_post_renditions(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old_name = None
+    if instance.pk:
+        old_name = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('image', flat=True).first()
+    if (old_name or '') != (instance.image.name or ''):
+        # До готовности новых копий шаблоны показывают оригинал.
+        instance._old_image_name = old_name
+        instance.renditions_ready = False
+
+
+def release_image(name, storage):
+    """Удаляет файл и его копии, если на него больше не ссылаются посты.
+
+    Одинаковые загрузки хранятся одним файлом, поэтому число ссылок
+    считается по таблице постов после фиксации транзакции. Файл, который
+    недавно загрузили ещё раз, может понадобиться записи из незавершённой
+    транзакции: его оставляем команде ``collect_media_garbage``.
+    """
+    cutoff = time.time() - settings.BLOG_IMAGE_RELEASE_GRACE
+
+    def release():
+        with storage.lock():
+            if (
+                storage.is_stale(name, cutoff)
+                and not Post.objects.filter(image=name).exists()
+            ):
+                delete_renditions(name, storage)
+                storage.delete(name)
+
+    transaction.on_commit(release)
+
+
+@receiver(post_save, sender=Post)
+def enqueue_post_renditions(sender, instance, **kwargs):
+    if '_old_image_name' not in instance.__dict__:
+        return
+    old_name = instance.__dict__.pop('_old_image_name')
+    name = instance.image.name
+    if old_name and old_name != name:
+        release_image(old_name, instance.image.storage)
+    if not name:
+        return
+    # Копии того же файла уже сделаны для другого поста.
+    if Post.objects.filter(
+        image=name, renditions_ready=True
+    ).exclude(pk=instance.pk).exists():
+        Post.objects.filter(pk=instance.pk).update(renditions_ready=True)
+        instance.renditions_ready = True
+    else:
+        ImageJob.objects.create(post=instance, image_name=name)
+
+
+@receiver(post_delete, sender=Post)
+def release_post_image(sender, instance, **kwargs):
+    if instance.image:
+        release_image(instance.image.name, instance.image.storage)
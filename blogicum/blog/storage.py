@@ -0,0 +1,103 @@
+import hashlib
+import os
+import re
+from contextlib import contextmanager
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, storages
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Имя уже построено от хэша: сам файл или его копия, например
+# img/ab/cd/abcd….w640.webp.
+HASHED_NAME = re.compile(
+    r'(?:^|/)([0-9a-f]{2})/([0-9a-f]{2})/\1\2[0-9a-f]{60}[^/]*$'
+)
+LOCK_NAME = '.images.lock'
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Файловое хранилище с именами по SHA-256 содержимого.
+
+    ``img/photo.jpg`` сохраняется как ``img/ab/cd/abcd….jpg``. Одинаковые
+    файлы записываются один раз; удалять файл можно, только когда на него
+    не ссылается ни одна запись. Файлы с уже хэшированными именами,
+    например копии изображения, сохраняются под переданным именем.
+
+    Повторная загрузка существующего файла обновляет его mtime: по нему
+    удаление (``release_image``, ``collect_media_garbage``) узнаёт, что
+    на файл вот-вот сошлётся ещё не сохранённая запись.
+    """
+
+    @contextmanager
+    def lock(self):
+        """Блокировка между проверкой файла перед удалением и удалением.
+
+        Вне POSIX-систем (без fcntl) ничего не блокирует.
+        """
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(self.location, exist_ok=True)
+        with open(os.path.join(self.location, LOCK_NAME), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def touch(self, name):
+        """Обновляет mtime файла; ``False``, если файла нет."""
+        with self.lock():
+            try:
+                os.utime(self.path(name))
+            except FileNotFoundError:
+                return False
+        return True
+
+    def content_name(self, name, content):
+        digest = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        digest = digest.hexdigest()
+        directory = os.path.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        return os.path.join(
+            directory, digest[:2], digest[2:4], f'{digest}{extension}'
+        )
+
+    def is_stale(self, name, cutoff):
+        """Файл есть и не менялся позже ``cutoff`` (Unix-время)."""
+        try:
+            return os.stat(self.path(name)).st_mtime <= cutoff
+        except FileNotFoundError:
+            return False
+
+    def save_exact(self, name, content):
+        """Сохраняет файл под именем ``name``, не переименовывая по хэшу.
+
+        Для вариантов изображений: их имена строятся от имени оригинала,
+        в том числе загруженного до перехода на имена по хэшу.
+        """
+        return super().save(name, content)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        if not HASHED_NAME.search(name):
+            name = self.content_name(name, content)
+        if self.touch(name):
+            return name
+        saved = self._save(name, content)
+        if saved != name:
+            # Тот же файл одновременно записал другой процесс.
+            self.delete(saved)
+        return name
+
+
+def select_image_storage():
+    return storages['post_images']
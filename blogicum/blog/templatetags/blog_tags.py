@@ -0,0 +1,61 @@
+from django import template
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from blog.cache import get_card_cache, post_card_key
+from blog.images import rendition_srcset
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_cards(posts):
+    """Отрисованные карточки постов страницы.
+
+    Карточки берутся из кэша одним запросом, отрисовываются
+    только отсутствующие.
+    """
+    cache = get_card_cache()
+    keys = [post_card_key(post) for post in posts]
+    cards = cache.get_many(keys)
+    missing = {}
+    for key, post in zip(keys, posts):
+        if key not in cards:
+            missing[key] = render_to_string(
+                'includes/post_card.html', {'post': post}
+            )
+    if missing:
+        cache.set_many(missing, settings.BLOG_CARD_CACHE_TIMEOUT)
+        cards.update(missing)
+    return [mark_safe(cards[key]) for key in keys]
+
+
+@register.inclusion_tag('includes/responsive_image.html')
+def responsive_image(image, width=None, height=None, ready=True,
+                     css_class='', loading='lazy',
+                     sizes='(max-width: 640px) 100vw, 640px'):
+    """Изображение с вариантами разной ширины в srcset.
+
+    Без сохранённых ``width`` и ``height`` размеры читаются из файла.
+    Пока варианты не готовы (``ready``), выводится только оригинал.
+    """
+    if not width or not height:
+        try:
+            width, height = image.width, image.height
+        except (OSError, ValueError):
+            width = height = None
+    context = {
+        'src': image.url,
+        'width': width,
+        'height': height,
+        'css_class': css_class,
+        'loading': loading,
+        'sizes': sizes,
+    }
+    if width and ready:
+        context['webp_srcset'] = rendition_srcset(image, width, 'webp')
+        context['jpeg_srcset'] = ', '.join(filter(None, (
+            rendition_srcset(image, width, 'jpeg'), f'{image.url} {width}w'
+        )))
+    return context
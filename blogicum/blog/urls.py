@@ -38,6 +38,11 @@ urlpatterns: List[URLPattern] = [
         views.CommentCreateView.as_view(),
         name='add_comment',
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.PostCommentsView.as_view(),
+        name='post_comments',
+    ),
     path(
         'posts/<int:post_id>/edit_comment/<int:comment_id>/',
         views.CommentUpdateView.as_view(),
@@ -1,16 +1,46 @@
-from django.db.models import Count
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
 from django.utils import timezone
 
 
+def visibility_bucket():
+    """Номер текущего интервала часов видимости публикаций.
+
+    Годится как часть ключа кэша: в пределах интервала ленты совпадают.
+    """
+    return int(timezone.now().timestamp()) // settings.BLOG_VISIBILITY_BUCKET
+
+
+def visibility_now():
+    """Момент, с которым сравнивается дата публикации постов.
+
+    Текущее время, округлённое вниз до начала интервала
+    ``BLOG_VISIBILITY_BUCKET`` секунд.
+    """
+    return datetime.fromtimestamp(
+        visibility_bucket() * settings.BLOG_VISIBILITY_BUCKET,
+        tz=dt_timezone.utc,
+    )
+
+
 def filter_published_posts(posts):
     return posts.filter(
         is_published=True,
-        pub_date__lte=timezone.now(),
+        pub_date__lte=visibility_now(),
         category__is_published=True
-    ).annotate(
-        comment_count=Count('comments')
     ).order_by(
         '-pub_date'
     ).select_related(
         'category', 'author', 'location'
     )
+
+
+def is_post_published(post):
+    """Проверка filter_published_posts для уже загруженного поста."""
+    return (
+        post.is_published
+        and post.pub_date <= visibility_now()
+        and post.category is not None
+        and post.category.is_published
+    )
@@ -1,6 +1,9 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import get_object_or_404, redirect
+from django.db.models import Max
+from django.http import Http404, HttpResponseRedirect
+from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils import timezone
 from django.views.generic import (
     CreateView,
     DeleteView,
@@ -9,49 +12,39 @@ from django.views.generic import (
     UpdateView,
 )
 
+from .comment_queue import enqueue, pending_comments, queue_enabled
 from .forms import CreateCommentForm, CreatePostForm
 from .models import Category, Comment, Post, User
-from .mixins import (CommentEditMixin, PostsEditMixin)
-from .utils import (filter_published_posts)
+from .cache import INDEX_SCOPE, author_scope, category_scope, post_scope
+from .mixins import (AnonymousPageCacheMixin, AuthorAccessMixin,
+                     CommentEditMixin, ConditionalGetMixin,
+                     KeysetPaginationMixin, PostsEditMixin,
+                     ReplicaReadMixin)
+from .paginators import paginate_by_keyset
+from .routers import same_database
+from .utils import filter_published_posts, is_post_published
 
 PAGINATED_BY = 10
+COMMENTS_PAGINATED_BY = 20
 
 
-class PostDeleteView(PostsEditMixin, LoginRequiredMixin, DeleteView):
+class PostDeleteView(AuthorAccessMixin, PostsEditMixin, LoginRequiredMixin,
+                     DeleteView):
     model = Post
     pk_url_kwarg = 'post_id'
-
-    def _can_manage(self, user, post):
-        return user == post.author or user.is_staff or user.is_superuser
-
-    def dispatch(self, request, *args, **kwargs):
-        post = get_object_or_404(Post, pk=self.kwargs[self.pk_url_kwarg])
-        if not self._can_manage(request.user, post):
-            return redirect('blog:post_detail', post_id=post.pk)
-        return super().dispatch(request, *args, **kwargs)
-
-    def delete(self, request, *args, **kwargs):
-        post = get_object_or_404(Post, pk=self.kwargs[self.pk_url_kwarg])
-        if not self._can_manage(request.user, post):
-            return redirect('blog:post_detail', post_id=post.pk)
-        return super().delete(request, *args, **kwargs)
+    related_fields = ('author', 'location')
+    staff_can_manage = True
 
     def get_success_url(self):
         return reverse('blog:profile', args=[self.object.author.username])
 
 
-class PostUpdateView(PostsEditMixin, LoginRequiredMixin, UpdateView):
+class PostUpdateView(AuthorAccessMixin, PostsEditMixin, LoginRequiredMixin,
+                     UpdateView):
     form_class = CreatePostForm
     model = Post
     pk_url_kwarg = 'post_id'
 
-    def dispatch(self, request, *args, **kwargs):
-        post = get_object_or_404(Post, pk=self.kwargs[self.pk_url_kwarg])
-        if self.request.user != post.author:
-            return redirect('blog:post_detail',
-                            post_id=self.kwargs[self.pk_url_kwarg])
-        return super().dispatch(request, *args, **kwargs)
-
     def get_success_url(self):
         return reverse('blog:post_detail',
                        args=[self.kwargs[self.pk_url_kwarg]])
@@ -79,53 +72,46 @@ class CommentCreateView(CommentEditMixin, LoginRequiredMixin, CreateView):
     def form_valid(self, form):
         form.instance.post = get_object_or_404(Post, pk=self.kwargs['post_id'])
         form.instance.author = self.request.user
+        if queue_enabled():
+            form.instance.created_at = timezone.now()
+            enqueue(form.instance)
+            return HttpResponseRedirect(self.get_success_url())
         return super().form_valid(form)
 
 
-class CommentDeleteView(CommentEditMixin, LoginRequiredMixin, DeleteView):
+class CommentDeleteView(AuthorAccessMixin, CommentEditMixin,
+                        LoginRequiredMixin, DeleteView):
     model = Comment
     pk_url_kwarg = 'comment_id'
+    staff_can_manage = True
 
-    def _can_manage(self, user, comment):
-        return user == comment.author or user.is_staff or user.is_superuser
-
-    def dispatch(self, request, *args, **kwargs):
-        comment = get_object_or_404(Comment, pk=self.kwargs[self.pk_url_kwarg])
-        if not self._can_manage(request.user, comment):
-            return redirect('blog:post_detail', post_id=self.kwargs['post_id'])
-        return super().dispatch(request, *args, **kwargs)
-
-    def delete(self, request, *args, **kwargs):
-        comment = get_object_or_404(Comment, pk=self.kwargs[self.pk_url_kwarg])
-        if not self._can_manage(request.user, comment):
-            return redirect('blog:post_detail', post_id=self.kwargs['post_id'])
-        return super().delete(request, *args, **kwargs)
 
-    def get_success_url(self):
-        return reverse('blog:post_detail', args=[self.kwargs['post_id']])
-
-
-class CommentUpdateView(CommentEditMixin, LoginRequiredMixin, UpdateView):
+class CommentUpdateView(AuthorAccessMixin, CommentEditMixin,
+                        LoginRequiredMixin, UpdateView):
     model = Comment
     form_class = CreateCommentForm
     pk_url_kwarg = 'comment_id'
 
-    def dispatch(self, request, *args, **kwargs):
-        comment = get_object_or_404(Comment, pk=self.kwargs[self.pk_url_kwarg])
-        if self.request.user != comment.author:
-            return redirect('blog:post_detail', post_id=self.kwargs['post_id'])
 
-        return super().dispatch(request, *args, **kwargs)
-
-
-class AuthorProfileListView(ListView):
+class AuthorProfileListView(ReplicaReadMixin, AnonymousPageCacheMixin,
+                            ConditionalGetMixin, KeysetPaginationMixin,
+                            ListView):
     model = Post
     template_name = 'blog/profile.html'
     paginate_by = PAGINATED_BY
 
+    def get_cache_scopes(self):
+        return (author_scope(self.kwargs['username']),)
+
+    def get_last_modified(self):
+        posts = Post.objects.filter(author__username=self.kwargs['username'])
+        if self.request.user.username != self.kwargs['username']:
+            posts = filter_published_posts(posts)
+        return posts.aggregate(Max('pub_date'))['pub_date__max']
+
     def get_queryset(self):
         author = get_object_or_404(User, username=self.kwargs['username'])
-        posts = author.posts.all()
+        posts = author.posts.select_related('category', 'location', 'author')
         if self.request.user != author:
             posts = filter_published_posts(posts)
         return posts
@@ -138,21 +124,41 @@ class AuthorProfileListView(ListView):
         return context
 
 
-class BlogIndexListView(ListView):
+class BlogIndexListView(ReplicaReadMixin, AnonymousPageCacheMixin,
+                        ConditionalGetMixin, KeysetPaginationMixin, ListView):
     model = Post
     template_name = 'blog/index.html'
     context_object_name = 'post_list'
     paginate_by = PAGINATED_BY
 
-    queryset = filter_published_posts(Post.objects)
+    def get_cache_scopes(self):
+        return (INDEX_SCOPE,)
+
+    def get_last_modified(self):
+        return filter_published_posts(Post.objects.all()).aggregate(
+            Max('pub_date')
+        )['pub_date__max']
+
+    def get_queryset(self):
+        return filter_published_posts(Post.objects.all())
 
 
-class BlogCategoryListView(ListView):
+class BlogCategoryListView(ReplicaReadMixin, AnonymousPageCacheMixin,
+                           ConditionalGetMixin, KeysetPaginationMixin,
+                           ListView):
     model = Post
     template_name = 'blog/category.html'
     context_object_name = 'post_list'
     paginate_by = PAGINATED_BY
 
+    def get_cache_scopes(self):
+        return (category_scope(self.kwargs['category_slug']),)
+
+    def get_last_modified(self):
+        return filter_published_posts(
+            Post.objects.filter(category__slug=self.kwargs['category_slug'])
+        ).aggregate(Max('pub_date'))['pub_date__max']
+
     def get_queryset(self):
         category_slug = self.kwargs['category_slug']
         category = get_object_or_404(Category, slug=category_slug,
@@ -161,24 +167,73 @@ class BlogCategoryListView(ListView):
         return posts
 
 
-class PostDetailView(DetailView):
+class PostDetailView(ReplicaReadMixin, AnonymousPageCacheMixin,
+                     ConditionalGetMixin, DetailView):
     model = Post
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_id'
+    queryset = Post.objects.select_related('category', 'location', 'author')
+
+    def get_cache_scopes(self):
+        return (post_scope(self.kwargs[self.pk_url_kwarg]),)
+
+    def get_last_modified(self):
+        post_id = self.kwargs[self.pk_url_kwarg]
+        # Только видимый запросу пост: как в get_object.
+        posts = Post.objects.filter(pk=post_id)
+        visible = filter_published_posts(posts)
+        if self.request.user.is_authenticated:
+            visible = visible | posts.filter(author=self.request.user)
+        if same_database(Post, Comment):
+            dates = visible.aggregate(
+                post=Max('pub_date'), comment=Max('comments__created_at')
+            ).values()
+        else:
+            published = visible.aggregate(Max('pub_date'))['pub_date__max']
+            if published is None:
+                return None
+            dates = [
+                published,
+                Comment.objects.filter(post_id=post_id).aggregate(
+                    Max('created_at')
+                )['created_at__max'],
+            ]
+        return max(filter(None, dates), default=None)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CreateCommentForm()
-        context['comments'] = (
-            self.get_object().comments.prefetch_related('author').all()
+        comments = self.object.comments.all()
+        if same_database(Comment, User):
+            comments = comments.select_related('author')
+        else:
+            comments = comments.prefetch_related('author')
+        _, page, comments, _ = paginate_by_keyset(
+            self.request,
+            comments,
+            COMMENTS_PAGINATED_BY,
+            field='created_at',
+            descending=False,
         )
+        context['comments'] = comments
+        context['comments_page'] = page
+        if queue_enabled() and self.request.user.is_authenticated:
+            # Автор сразу видит свои комментарии, ждущие записи в базу.
+            context['pending_comments'] = pending_comments(
+                self.object, self.request.user
+            )
         return context
 
     def get_object(self, queryset=None):
-        post = get_object_or_404(Post, pk=self.kwargs.get(self.pk_url_kwarg))
-        if self.request.user == post.author:
-            return post
-        return get_object_or_404(
-            filter_published_posts(Post.objects.all()),
-            pk=self.kwargs.get(self.pk_url_kwarg)
-        )
+        post = super().get_object(queryset)
+        if (post.author_id != self.request.user.pk
+                and not is_post_published(post)):
+            raise Http404('Публикация не найдена.')
+        return post
+
+
+class PostCommentsView(PostDetailView):
+    """Следующая порция комментариев поста в виде HTML-фрагмента."""
+
+    template_name = 'includes/comments.html'
+    extra_context = {'fragment': True}
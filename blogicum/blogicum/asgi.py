@@ -14,3 +14,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_asgi_application()
+
+# Прогрев соединений (blogicum.warmup) здесь не выполняется: он
+# рассчитан только на WSGI-серверы с предварительным fork процессов
+# (gunicorn --preload). Под ASGI Django выполняет синхронный код каждого
+# запроса в новом потоке (ThreadSensitiveContext), а соединения привязаны
+# к потоку, поэтому открытые при запуске соединения запросам не достаются.
+# Для ASGI стоит задать DB_CONN_MAX_AGE=0.
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -41,6 +42,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'pages.staticfiles.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -48,6 +50,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
+    'blog.middleware.ReadYourWritesMiddleware',
 ]
 
 ROOT_URLCONF = 'blogicum.urls'
@@ -76,11 +79,103 @@ WSGI_APPLICATION = 'blogicum.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# PRAGMA SQLite, выполняемые при каждом подключении; значения можно
+# переопределить переменными окружения SQLITE_<ИМЯ>. WAL не блокирует
+# читателей во время записи, busy_timeout (мс) заставляет писателей
+# ждать блокировку вместо ошибки "database is locked".
+SQLITE_PRAGMAS = {
+    name: os.getenv(f'SQLITE_{name.upper()}', default)
+    for name, default in {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'mmap_size': 128 * 1024 * 1024,
+        'cache_size': -20000,
+        'temp_store': 'MEMORY',
+    }.items()
+}
+
+SQLITE_OPTIONS = {
+    'init_command': ';'.join(
+        f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()
+    ),
+    # Запись сразу берёт блокировку, и busy_timeout действует:
+    # отложенная транзакция не может дождаться её при повышении.
+    'transaction_mode': 'IMMEDIATE',
+}
+
 DATABASES = {
-    'default': {
+    alias: {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': BASE_DIR / file_name,
+        'OPTIONS': dict(SQLITE_OPTIONS),
     }
+    for alias, file_name in (
+        ('default', 'db.sqlite3'),
+        ('comments', 'comments.sqlite3'),
+        ('sessions', 'sessions.sqlite3'),
+    )
+}
+# Постов и пользователей в базе комментариев нет: внешние ключи там
+# не проверяются.
+DATABASES['comments']['ENGINE'] = 'blog.backends.sqlite3'
+
+# Снимок основной базы только для чтения, который публикует
+# manage.py publish_snapshot. Соединение со снимком не должно быть
+# постоянным: новый снимок подменяет файл.
+BLOG_REPLICA_SNAPSHOT = BASE_DIR / 'replica.sqlite3'
+DATABASES['replica'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': f'{BLOG_REPLICA_SNAPSHOT.as_uri()}?mode=ro&immutable=1',
+    'OPTIONS': {
+        'uri': True,
+        'init_command': ';'.join(
+            f'PRAGMA {name}={SQLITE_PRAGMAS[name]}'
+            for name in ('mmap_size', 'cache_size', 'temp_store')
+        ),
+    },
+    'TEST': {'MIRROR': 'default'},
+}
+
+DATABASE_ROUTERS = [
+    'blog.routers.SplitDatabaseRouter',
+    'blog.routers.ReplicaRouter',
+]
+
+# Отдельные файлы SQLite для моделей с частой записью: комментарии
+# и сессии не ждут блокировку основной базы. Включается переменной
+# окружения BLOG_SPLIT_DATABASES=1 после migrate --database для каждой
+# базы; существующие записи переносятся через dumpdata/loaddata
+# --database. Чтобы оставить сессии в основной базе, уберите их из
+# BLOG_DATABASE_ROUTES.
+BLOG_SPLIT_DATABASES = os.getenv('BLOG_SPLIT_DATABASES') == '1'
+BLOG_DATABASE_ROUTES = {
+    'blog.comment': 'comments',
+    'sessions.session': 'sessions',
+}
+
+# Чтение лент и страниц постов из снимка (BLOG_READ_REPLICA=1). После
+# изменяющего запроса пользователь BLOG_REPLICA_STICKY_SECONDS секунд
+# читает из основной базы и видит свои правки; срок должен быть больше
+# интервала публикации снимков.
+BLOG_READ_REPLICA = os.getenv('BLOG_READ_REPLICA') == '1'
+BLOG_REPLICA_STICKY_COOKIE = 'recent_write'
+BLOG_REPLICA_STICKY_SECONDS = 60
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+# Для нескольких процессов укажите для `pages` общий бэкенд, например
+# django.core.cache.backends.filebased.FileBasedCache.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'pages': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'blog-pages',
+    },
 }
 
 
@@ -122,6 +217,48 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+STATIC_ROOT = BASE_DIR / 'static_root'
+
+# Время кэширования в браузере статики без хэша в имени, секунды.
+STATIC_CACHE_MAX_AGE = 60 * 60
+
+# Откуда брать Bootstrap: 'local' — из своей статики (с хэшем в имени
+# и подсказкой preload), 'cdn' — с CDN django_bootstrap5.
+BOOTSTRAP_ASSETS = 'local'
+
+# Встраивать в <head> стили первого экрана, а остальные стили Bootstrap
+# без неиспользуемых классов грузить асинхронно. Файлы собирает
+# manage.py build_css; его нужно перезапускать после правки шаблонов.
+# Действует только при BOOTSTRAP_ASSETS = 'local'.
+CSS_CRITICAL_INLINE = True
+
+
+def staticfiles_storage(debug):
+    """Хранилище статики: без отладки collectstatic добавляет хэш
+    содержимого к именам и кладёт рядом сжатые копии .gz/.br.
+
+    Функция, а не выражение: настройки, меняющие DEBUG после импорта
+    этого модуля, пересчитывают хранилище тем же правилом.
+    """
+    return {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if debug
+            else 'pages.staticfiles.CompressedManifestStaticFilesStorage'
+        ),
+    }
+
+
+# Изображения публикаций хранятся под хэшем содержимого без дубликатов.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': staticfiles_storage(DEBUG),
+    'post_images': {
+        'BACKEND': 'blog.storage.ContentAddressedStorage',
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -141,3 +278,52 @@ EMAIL_FILE_PATH = BASE_DIR / 'sent_emails/'
 MEDIA_ROOT = BASE_DIR / 'media/'
 
 MEDIA_URL = '/media/'
+
+# Передача медиафайлов фронтовому прокси: None — отдаёт сам Django,
+# 'x-accel-redirect' — nginx (internal-location MEDIA_ACCEL_PREFIX
+# с alias на MEDIA_ROOT), 'x-sendfile' — Apache mod_xsendfile, lighttpd.
+MEDIA_ACCEL = None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+
+# Время кэширования медиафайлов в браузере, секунды. Файлы с именами
+# по хэшу содержимого кэшируются на год.
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24
+
+# Курсорная пагинация лент (?after=/?before=) вместо постраничной (?page=).
+BLOG_KEYSET_PAGINATION = False
+
+# Шаг часов видимости публикаций, секунды: отложенные посты появляются
+# в лентах с точностью до этого интервала.
+BLOG_VISIBILITY_BUCKET = 30
+
+# Кэш страниц для анонимных читателей: алиас из CACHES и время жизни.
+BLOG_PAGE_CACHE_ALIAS = 'pages'
+BLOG_PAGE_CACHE_TIMEOUT = 300
+
+# Кэш отрисованных карточек постов; ключи версионированы, поэтому
+# время жизни может быть большим.
+BLOG_CARD_CACHE_ALIAS = 'default'
+BLOG_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Уменьшенные копии изображений публикаций: ширины в пикселях
+# и качество сжатия WebP/JPEG.
+BLOG_IMAGE_WIDTHS = (320, 640, 1280)
+BLOG_IMAGE_QUALITY = 80
+
+# Обработка загружаемых изображений: наибольшая сторона в пикселях,
+# качество JPEG и предельное число пикселей исходника.
+BLOG_UPLOAD_MAX_SIDE = 2560
+BLOG_UPLOAD_QUALITY = 85
+BLOG_UPLOAD_MAX_PIXELS = 50_000_000
+
+# Сколько секунд после последней загрузки файл изображения без ссылок
+# не удаляется сразу: на него может сослаться пост из ещё не
+# завершённой транзакции. Такие файлы убирает collect_media_garbage.
+BLOG_IMAGE_RELEASE_GRACE = 60 * 5
+
+# Сколько раз повторять неудавшуюся обработку изображения.
+BLOG_IMAGE_JOB_ATTEMPTS = 3
+
+# Файл очереди комментариев: если задан, комментарии записываются
+# в базу пачками командой flush_comments, а не каждый своей транзакцией.
+BLOG_COMMENT_QUEUE = os.getenv('BLOG_COMMENT_QUEUE')
@@ -0,0 +1,24 @@
+"""Настройки продакшена (blogicum.settings_production)."""
+import copy
+import os
+
+from .settings import *  # noqa: F401, F403
+from .settings import DATABASES, STORAGES, staticfiles_storage
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.getenv('DJANGO_ALLOWED_HOSTS', 'localhost').split(',')
+
+STORAGES = {**STORAGES, 'staticfiles': staticfiles_storage(DEBUG)}
+
+# Постоянные соединения: подключение и PRAGMA выполняются один раз
+# на поток процесса, а не на каждый запрос. Перед переиспользованием
+# соединение проверяется (CONN_HEALTH_CHECKS). Снимок для чтения
+# подменяется файлом, поэтому к нему подключаемся заново на запрос.
+DATABASES = copy.deepcopy(DATABASES)
+for alias, database in DATABASES.items():
+    database['CONN_MAX_AGE'] = (
+        0 if alias == 'replica'
+        else int(os.getenv('DB_CONN_MAX_AGE', 600))
+    )
+    database['CONN_HEALTH_CHECKS'] = True
@@ -1,10 +1,11 @@
 from typing import List
 
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import URLPattern, include, path
 
+from pages.media import serve_media
+
 handler403 = 'pages.views.permission_denied'
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.server_error'
@@ -22,4 +23,9 @@ if settings.DEBUG:
 
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
 
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+urlpatterns += (
+    path(
+        f'{settings.MEDIA_URL.strip("/")}/<path:path>', serve_media,
+        name='media',
+    ),
+)
@@ -0,0 +1,54 @@
+"""Прогрев соединений с базами при запуске процесса приложения.
+
+Постоянные соединения (CONN_MAX_AGE > 0) открываются до первого
+запроса: подключение и PRAGMA из init_command не ложатся на время
+ответа. Соединения SQLite нельзя переносить через fork, поэтому перед
+fork (gunicorn --preload) они закрываются, а в дочернем процессе
+открываются заново. Прогрев подключается только в wsgi.py: под ASGI
+запросы выполняются в новых потоках и соединения не переиспользуются.
+"""
+import logging
+import os
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+
+def used_aliases():
+    """Базы, с которыми работают запросы (кроме снимка для чтения)."""
+    aliases = {DEFAULT_DB_ALIAS}
+    if settings.BLOG_SPLIT_DATABASES:
+        aliases |= set(settings.BLOG_DATABASE_ROUTES.values())
+    return sorted(aliases)
+
+
+def persistent_connections():
+    return [
+        connections[alias] for alias in used_aliases()
+        if connections[alias].settings_dict['CONN_MAX_AGE'] != 0
+    ]
+
+
+def warm_up_connections():
+    for connection in persistent_connections():
+        try:
+            connection.ensure_connection()
+        except DatabaseError as error:
+            logger.warning(
+                'Не удалось открыть соединение %s: %s', connection.alias, error
+            )
+
+
+def close_connections():
+    for connection in persistent_connections():
+        connection.close()
+
+
+def warm_up_after_fork():
+    """Прогревает соединения сейчас и в каждом дочернем процессе."""
+    warm_up_connections()
+    os.register_at_fork(
+        before=close_connections, after_in_child=warm_up_connections
+    )
@@ -0,0 +1,169 @@
+"""Очистка таблицы стилей от неиспользуемых правил.
+
+Разбор рассчитан на минифицированный CSS вроде ``bootstrap.min.css``:
+правила и группирующие at-правила (``@media``, ``@supports``...)
+разбираются в дерево, из списков селекторов убираются селекторы
+с незнакомыми классами (и, если задан набор, элементами), пустые
+правила и группы выбрасываются.
+"""
+import re
+
+SOURCE_CSS = 'css/bootstrap.min.css'
+PURGED_CSS = 'css/bootstrap.purged.css'
+CRITICAL_CSS = 'css/critical.css'
+
+GROUP_AT_RULES = ('@media', '@supports', '@container', '@layer')
+CLASS_SELECTOR = re.compile(r'\.((?:\\.|[\w-])+)')
+TYPE_SELECTOR = re.compile(r'(?:^|[\s>+~])([a-zA-Z][\w-]*)')
+ATTRIBUTE_SELECTOR = re.compile(r'\[[^\]]*\]')
+PSEUDO_ARGUMENTS = re.compile(r'\([^()]*\)')
+TOKEN = re.compile(r'[\w-]+')
+TAG = re.compile(r'<([a-zA-Z][\w-]*)')
+
+
+def template_tokens(text):
+    """Слова шаблона, которые могут оказаться именами классов.
+
+    Как и PurgeCSS, берём все похожие на имя слова, поэтому классы
+    из ``{% if %}`` и аргументов тегов тоже учитываются.
+    """
+    return set(TOKEN.findall(text))
+
+
+def template_tags(text):
+    return {tag.lower() for tag in TAG.findall(text)}
+
+
+def _skip_string(css, pos):
+    quote = css[pos]
+    pos += 1
+    while pos < len(css) and css[pos] != quote:
+        pos += 2 if css[pos] == '\\' else 1
+    return pos
+
+
+def _block_end(css, pos):
+    """Позиция ``}``, закрывающей блок, который начинается после ``pos``."""
+    depth = 0
+    while pos < len(css):
+        char = css[pos]
+        if char in '"\'':
+            pos = _skip_string(css, pos)
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if not depth:
+                return pos
+        pos += 1
+    return pos
+
+
+def parse(css, pos=0):
+    """Дерево узлов: ('rule', селекторы, тело), ('group', prelude, узлы),
+    ('statement', текст) и ('comment', текст) для комментариев ``/*!``.
+    """
+    nodes = []
+    start = pos
+    while pos < len(css):
+        char = css[pos]
+        if char in '"\'':
+            pos = _skip_string(css, pos)
+        elif css.startswith('/*', pos):
+            end = css.find('*/', pos + 2)
+            end = len(css) if end < 0 else end + 2
+            if css.startswith('/*!', pos):
+                nodes.append(('comment', css[pos:end]))
+            pos = start = end
+            continue
+        elif char == ';':
+            statement = css[start:pos].strip()
+            if statement:
+                nodes.append(('statement', statement))
+            start = pos + 1
+        elif char == '{':
+            prelude = css[start:pos].strip()
+            if prelude.startswith(GROUP_AT_RULES):
+                children, pos = parse(css, pos + 1)
+                nodes.append(('group', prelude, children))
+            else:
+                end = _block_end(css, pos)
+                nodes.append(('rule', prelude, css[pos + 1:end]))
+                pos = end
+            start = pos + 1
+        elif char == '}':
+            return nodes, pos
+        pos += 1
+    return nodes, pos
+
+
+def serialize(nodes):
+    parts = []
+    for node in nodes:
+        if node[0] == 'rule':
+            parts.append(f'{node[1]}{{{node[2]}}}')
+        elif node[0] == 'group':
+            parts.append(f'{node[1]}{{{serialize(node[2])}}}')
+        elif node[0] == 'statement':
+            parts.append(f'{node[1]};')
+        else:
+            parts.append(node[1])
+    return ''.join(parts)
+
+
+def split_selectors(prelude):
+    """Делит список селекторов по запятым вне скобок."""
+    selectors = []
+    depth = start = 0
+    for pos, char in enumerate(prelude):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and not depth:
+            selectors.append(prelude[start:pos])
+            start = pos + 1
+    selectors.append(prelude[start:])
+    return [selector.strip() for selector in selectors]
+
+
+def selector_matches(selector, classes, elements=None):
+    """Может ли селектор совпасть с разметкой из известных классов и тегов."""
+    if not set(CLASS_SELECTOR.findall(selector)) <= classes:
+        return False
+    if elements is None:
+        return True
+    selector = ATTRIBUTE_SELECTOR.sub('', selector)
+    while PSEUDO_ARGUMENTS.search(selector):
+        selector = PSEUDO_ARGUMENTS.sub('', selector)
+    return {
+        name.lower() for name in TYPE_SELECTOR.findall(selector)
+    } <= elements
+
+
+def purge(nodes, classes, elements=None):
+    """Копия дерева только с селекторами, подходящими под разметку."""
+    kept = []
+    for node in nodes:
+        if node[0] == 'rule':
+            if node[1].startswith('@'):
+                # @font-face, @keyframes, @page: без селекторов.
+                kept.append(node)
+                continue
+            selectors = [
+                selector for selector in split_selectors(node[1])
+                if selector_matches(selector, classes, elements)
+            ]
+            if selectors:
+                kept.append(('rule', ','.join(selectors), node[2]))
+        elif node[0] == 'group':
+            children = purge(node[2], classes, elements)
+            if children:
+                kept.append(('group', node[1], children))
+        else:
+            kept.append(node)
+    return kept
+
+
+def purge_css(css, classes, elements=None):
+    return serialize(purge(parse(css)[0], classes, elements))
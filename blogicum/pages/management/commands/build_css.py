@@ -0,0 +1,80 @@
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from pages.css import (
+    CRITICAL_CSS,
+    PURGED_CSS,
+    SOURCE_CSS,
+    purge_css,
+    template_tags,
+    template_tokens,
+)
+
+# Разметка первого экрана: шапка и карточки ленты.
+CRITICAL_TEMPLATES = (
+    'base.html',
+    'includes/header.html',
+    'includes/post_card.html',
+    'includes/responsive_image.html',
+)
+# Классы, которые django_bootstrap5 подставляет в формы из кода,
+# а не из шаблонов.
+SAFELIST = {
+    'alert', 'alert-danger', 'alert-dismissible', 'btn', 'btn-close',
+    'btn-primary', 'col-form-label', 'fade', 'form-check',
+    'form-check-inline', 'form-check-input', 'form-check-label',
+    'form-control', 'form-floating', 'form-label', 'form-range',
+    'form-select', 'form-switch', 'form-text', 'has-validation',
+    'input-group', 'input-group-text', 'invalid-feedback', 'is-invalid',
+    'is-valid', 'mb-3', 'row', 'show', 'text-danger', 'valid-feedback',
+    'visually-hidden',
+}
+# Элементы, которые всегда есть на странице.
+CRITICAL_ELEMENTS = {'html', 'body'}
+
+
+class Command(BaseCommand):
+    help = (
+        'Собирает из Bootstrap таблицу стилей только с используемыми '
+        'в шаблонах классами и критические стили первого экрана.'
+    )
+
+    def handle(self, *args, **options):
+        static_dir = Path(settings.STATICFILES_DIRS[0])
+        css = (static_dir / SOURCE_CSS).read_text(encoding='utf-8')
+        template_dirs = [
+            Path(directory)
+            for engine in settings.TEMPLATES
+            for directory in engine['DIRS']
+        ]
+        classes = set(SAFELIST)
+        for directory in template_dirs + [
+            Path(apps.get_app_config('django_bootstrap5').path) / 'templates'
+        ]:
+            for path in directory.rglob('*.html'):
+                classes |= template_tokens(path.read_text(encoding='utf-8'))
+
+        critical_classes = set()
+        elements = set(CRITICAL_ELEMENTS)
+        for name in CRITICAL_TEMPLATES:
+            path = next(
+                directory / name for directory in template_dirs
+                if (directory / name).exists()
+            )
+            text = path.read_text(encoding='utf-8')
+            critical_classes |= template_tokens(text)
+            elements |= template_tags(text)
+
+        outputs = {
+            PURGED_CSS: purge_css(css, classes),
+            CRITICAL_CSS: purge_css(css, critical_classes, elements),
+        }
+        for name, content in outputs.items():
+            (static_dir / name).write_text(content, encoding='utf-8')
+            self.stdout.write(f'{name}: {len(content)} байт')
+        self.stdout.write(self.style.SUCCESS(
+            f'Исходный {SOURCE_CSS}: {len(css)} байт'
+        ))
@@ -0,0 +1,164 @@
+"""Отдача загруженных пользователями файлов (MEDIA_ROOT).
+
+Файлы публичные, поэтому проверяются только условные заголовки:
+ETag и Last-Modified дают ответ 304, Range — ответ 206. Если настроен
+``MEDIA_ACCEL``, тело ответа отдаёт фронтовой прокси: nginx по
+заголовку X-Accel-Redirect, Apache или lighttpd по X-Sendfile.
+Иначе файл отдаётся через ``FileResponse``, который WSGI-сервер
+передаёт в ``os.sendfile``.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from blog.storage import HASHED_NAME
+
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileRange:
+    """Часть открытого файла длиной ``length`` байт с позиции ``start``.
+
+    ``fileno`` остаётся доступным, поэтому сервер может отправить часть
+    через sendfile, ограничившись длиной из Content-Length.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.name = file.name
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """Границы запрошенного диапазона: (start, end), None или False.
+
+    None — заголовок не задан или не поддерживается (несколько
+    диапазонов), и файл отдаётся целиком; False — диапазон
+    за пределами файла.
+    """
+    match = RANGE.match(header.replace(' ', ''))
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    start, end = match.groups()
+    if start == '':
+        suffix = int(end)
+        if not suffix or not size:
+            return False
+        return max(size - suffix, 0), size - 1
+    start = int(start)
+    end = size - 1 if end == '' else min(int(end), size - 1)
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def range_is_fresh(request, etag, last_modified):
+    """Проверка If-Range: диапазон отдаётся, только если файл не менялся."""
+    if_range = request.headers.get('If-Range')
+    if if_range is None:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def media_file(path):
+    """Полный путь и stat файла внутри MEDIA_ROOT, иначе Http404."""
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    return full_path, stat
+
+
+@require_safe
+def serve_media(request, path):
+    full_path, stat = media_file(path)
+    last_modified = int(stat.st_mtime)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    headers = HttpResponse()
+    headers['ETag'] = etag
+    headers['Last-Modified'] = http_date(last_modified)
+    if HASHED_NAME.search(path):
+        # Имя построено по содержимому: файл по этому адресу не меняется.
+        patch_cache_control(
+            headers, public=True, max_age=60 * 60 * 24 * 365, immutable=True
+        )
+    else:
+        patch_cache_control(
+            headers, public=True, max_age=settings.MEDIA_CACHE_MAX_AGE
+        )
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified, response=headers
+    )
+    if response is not headers:
+        return response
+
+    content_type = (
+        mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    )
+    if settings.MEDIA_ACCEL == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = (
+            settings.MEDIA_ACCEL_PREFIX + quote(path)
+        )
+    elif settings.MEDIA_ACCEL == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = full_path
+    else:
+        response = file_response(
+            request, full_path, stat.st_size, content_type,
+            range_is_fresh(request, etag, last_modified),
+        )
+    for header in ('ETag', 'Last-Modified', 'Cache-Control'):
+        response[header] = headers[header]
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def file_response(request, full_path, size, content_type, use_range):
+    byte_range = None
+    if use_range and 'Range' in request.headers:
+        byte_range = parse_range(request.headers['Range'], size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    file = open(full_path, 'rb')
+    if byte_range is None:
+        return FileResponse(file, content_type=content_type)
+    start, end = byte_range
+    response = FileResponse(
+        FileRange(file, start, end - start + 1),
+        content_type=content_type,
+        status=206,
+    )
+    response['Content-Length'] = end - start + 1
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
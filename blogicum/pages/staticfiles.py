@@ -0,0 +1,193 @@
+"""Статические файлы для продакшена без отдельного веб-сервера.
+
+``collectstatic`` с ``CompressedManifestStaticFilesStorage`` складывает
+в STATIC_ROOT копии файлов с хэшем содержимого в имени, манифест
+``staticfiles.json`` и рядом с текстовыми файлами сжатые версии
+``.gz`` и ``.br`` (brotli — если установлен пакет Brotli).
+
+``StaticFilesMiddleware`` отдаёт собранные файлы из процесса Django:
+выбирает сжатую версию по Accept-Encoding, а файлы с хэшем в имени
+помечает ``Cache-Control: immutable``.
+"""
+import gzip
+import json
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {
+    '.css', '.js', '.mjs', '.map', '.json', '.svg', '.txt', '.xml',
+    '.html', '.ico', '.webmanifest',
+}
+# Файлы меньше этого размера не сжимаются: выигрыш меньше заголовков.
+MIN_COMPRESS_SIZE = 256
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+
+def compress(path):
+    """Пишет ``path.gz`` и ``path.br``, если они заметно меньше файла."""
+    with open(path, 'rb') as source:
+        content = source.read()
+    if len(content) < MIN_COMPRESS_SIZE:
+        return
+    compressors = {'.gz': lambda data: gzip.compress(data, 9, mtime=0)}
+    if brotli is not None:
+        compressors['.br'] = lambda data: brotli.compress(data)
+    for extension, compressor in compressors.items():
+        compressed = compressor(content)
+        if len(compressed) < len(content) * 0.95:
+            with open(path + extension, 'wb') as target:
+                target.write(compressed)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хранилище с хэшированными именами и заранее сжатыми копиями."""
+
+    def url_converter(self, name, hashed_files, template=None):
+        converter = super().url_converter(name, hashed_files, template)
+
+        def convert(matchobj):
+            try:
+                return converter(matchobj)
+            except ValueError:
+                # Сторонние файлы (bootstrap.min.css) ссылаются на карты
+                # кода, которых нет в поставке: ссылка остаётся как есть.
+                if matchobj['url'].strip().endswith('.map'):
+                    return matchobj['matched']
+                raise
+
+        return convert
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in paths:
+            if os.path.splitext(name)[1] not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            compress(self.path(name))
+            hashed_name = self.hashed_files.get(self.hash_key(name))
+            if hashed_name:
+                compress(self.path(hashed_name))
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = params.strip().removeprefix('q=')
+        if quality and quality.replace('.', '').strip('0') == '':
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class StaticFile:
+    def __init__(self, path, immutable):
+        self.path = path
+        self.immutable = immutable
+        self.content_type = (
+            mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        )
+        self.encodings = {
+            encoding: path + extension
+            for encoding, extension in ENCODINGS.items()
+            if os.path.isfile(path + extension)
+        }
+
+    def variant(self, accept_encoding):
+        accepted = accepted_encodings(accept_encoding)
+        for encoding, path in self.encodings.items():
+            if encoding in accepted or '*' in accepted:
+                return encoding, path
+        return None, self.path
+
+
+class StaticFilesMiddleware:
+    """Отдаёт файлы из STATIC_ROOT, собранные ``collectstatic``.
+
+    Список файлов строится один раз при запуске процесса. Без манифеста
+    в STATIC_ROOT (разработка, DEBUG) middleware отключается, и статику
+    отдаёт ``runserver``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        root = settings.STATIC_ROOT
+        manifest = os.path.join(root or '', 'staticfiles.json')
+        if (
+            not root or not os.path.isfile(manifest)
+            or '://' in settings.STATIC_URL
+        ):
+            raise MiddlewareNotUsed
+        with open(manifest, encoding='utf-8') as manifest_file:
+            hashed = set(json.load(manifest_file).get('paths', {}).values())
+        self.prefix = settings.STATIC_URL
+        self.files = {}
+        for directory, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(directory, name)
+                if os.path.splitext(name)[1] in ENCODINGS.values() and (
+                    os.path.isfile(os.path.splitext(path)[0])
+                ):
+                    continue
+                relative = os.path.relpath(path, root).replace(os.sep, '/')
+                self.files[self.prefix + relative] = StaticFile(
+                    path, relative in hashed
+                )
+
+    def __call__(self, request):
+        static_file = self.files.get(request.path_info)
+        if static_file is None or request.method not in ('GET', 'HEAD'):
+            return self.get_response(request)
+        return self.serve(request, static_file)
+
+    def serve(self, request, static_file):
+        encoding, path = static_file.variant(
+            request.headers.get('Accept-Encoding', '')
+        )
+        stat = os.stat(path)
+        headers = HttpResponse()
+        headers['ETag'] = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        headers['Last-Modified'] = http_date(stat.st_mtime)
+        if static_file.immutable:
+            patch_cache_control(
+                headers, public=True, max_age=IMMUTABLE_MAX_AGE,
+                immutable=True,
+            )
+        else:
+            patch_cache_control(
+                headers, public=True, max_age=settings.STATIC_CACHE_MAX_AGE
+            )
+        if static_file.encodings:
+            patch_vary_headers(headers, ('Accept-Encoding',))
+        response = get_conditional_response(
+            request, etag=headers['ETag'], last_modified=int(stat.st_mtime),
+            response=headers,
+        )
+        if response is headers:
+            response = FileResponse(
+                open(path, 'rb'), content_type=static_file.content_type
+            )
+            if encoding:
+                response['Content-Encoding'] = encoding
+        for header in ('ETag', 'Last-Modified', 'Cache-Control', 'Vary'):
+            if headers.has_header(header):
+                response[header] = headers[header]
+        return response
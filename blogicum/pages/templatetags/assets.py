@@ -0,0 +1,51 @@
+from functools import lru_cache
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from pages.css import CRITICAL_CSS, PURGED_CSS, SOURCE_CSS
+
+register = template.Library()
+
+
+@lru_cache(maxsize=None)
+def static_text(name):
+    """Содержимое статического файла: собранного или из исходников."""
+    try:
+        with staticfiles_storage.open(name) as static_file:
+            return static_file.read().decode('utf-8')
+    except (OSError, ValueError):
+        path = finders.find(name)
+    if not path:
+        return None
+    with open(path, encoding='utf-8') as static_file:
+        return static_file.read()
+
+
+@receiver(setting_changed)
+def reset_static_text(setting, **kwargs):
+    if setting in ('STATICFILES_DIRS', 'STATIC_ROOT', 'STORAGES'):
+        static_text.cache_clear()
+
+
+@register.inclusion_tag('includes/stylesheets.html')
+def stylesheets():
+    """Критические стили в <head> и остальные без блокировки отрисовки.
+
+    Если ``manage.py build_css`` ещё не запускался, подключается полный
+    Bootstrap: из своей статики или, при ``BOOTSTRAP_ASSETS = 'cdn'``,
+    через ``{% bootstrap_css %}``.
+    """
+    local = settings.BOOTSTRAP_ASSETS == 'local'
+    critical_css = (
+        local and settings.CSS_CRITICAL_INLINE and static_text(CRITICAL_CSS)
+    )
+    return {
+        'critical_css': critical_css,
+        'local': local,
+        'stylesheet': PURGED_CSS if critical_css else SOURCE_CSS,
+    }
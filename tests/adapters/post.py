@@ -33,6 +33,12 @@ class PostModelAdapter(StudentModelAdapter):
             "author",
             "category",
             "location",
+            "comment_count",
+            "renditions_ready",
+            "image_width",
+            "image_height",
+            "image_bytes",
+            "image_hash",
             "refresh_from_db",
         ]
 
@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +42,14 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Страницы и поколения областей кэша не должны переходить
+    # из теста в тест.
+    for cache in caches.all():
+        cache.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -353,6 +362,7 @@ def cleanup(request):
 
     yield
 
+    from blog.storage import LOCK_NAME
     from blogicum import settings
 
     image_dir = Path(settings.__file__).parent.parent / settings.MEDIA_ROOT
@@ -363,7 +373,17 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename == LOCK_NAME
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
                     os.remove(file_path)
+
+    # Файлы по хэшу содержимого лежат в подкаталогах img/ab/cd/.
+    for root, dirs, files in os.walk(image_dir, topdown=False):
+        if (
+                Path(root) != image_dir
+                and not os.listdir(root)
+                and os.path.getmtime(root) >= start_time
+        ):
+            os.rmdir(root)
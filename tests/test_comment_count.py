@@ -0,0 +1,107 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comment_changes(
+        mixer, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Первый"})
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что счётчик комментариев публикации увеличивается при "
+        "добавлении комментария."
+    )
+
+    comment = post.comments.first()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что счётчик комментариев публикации уменьшается при "
+        "удалении комментария."
+    )
+
+    post.comments.all().delete()
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        "Убедитесь, что счётчик комментариев публикации учитывает массовое "
+        "удаление комментариев."
+    )
+
+
+def test_recount_comments_command(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(4).blend("blog.Comment", post=post)
+    type(post).objects.update(comment_count=0)
+    call_command("recount_comments", stdout=StringIO())
+    post.refresh_from_db()
+    assert post.comment_count == 4, (
+        "Убедитесь, что команда `recount_comments` восстанавливает счётчик "
+        "комментариев публикаций."
+    )
+
+
+def test_post_deletion_queries_do_not_grow_with_comments(
+        mixer, user, post_with_published_location
+):
+    Post = type(post_with_published_location)
+    queries = []
+    for comments in (1, 10):
+        post = mixer.blend(Post, author=user, category=None, location=None)
+        mixer.cycle(comments).blend("blog.Comment", post=post)
+        with CaptureQueriesContext(connection) as captured:
+            post.delete()
+        queries.append(len(captured))
+    assert queries[0] == queries[1], (
+        "Убедитесь, что при удалении публикации не выполняется отдельный "
+        "запрос на каждый её комментарий."
+    )
+
+
+def test_user_deletion_keeps_other_counters(
+        mixer, user, another_user, post_with_published_location
+):
+    post = post_with_published_location
+    own_post = mixer.blend(type(post), author=another_user)
+    mixer.cycle(2).blend("blog.Comment", post=post, author=another_user)
+    mixer.blend("blog.Comment", post=post, author=user)
+    mixer.blend("blog.Comment", post=own_post, author=user)
+    another_user.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что при удалении пользователя уменьшаются счётчики "
+        "комментариев чужих публикаций."
+    )
+
+
+@pytest.mark.parametrize("delete", ["user", "queryset"])
+def test_comment_deletion_queries_do_not_grow_with_comments(
+        mixer, another_user, post_with_published_location, delete
+):
+    post = post_with_published_location
+    queries = []
+    for comments in (1, 10):
+        author = another_user
+        if delete == "user":
+            author = mixer.blend(get_user_model())
+        mixer.cycle(comments).blend("blog.Comment", post=post, author=author)
+        with CaptureQueriesContext(connection) as captured:
+            if delete == "user":
+                author.delete()
+            else:
+                post.comments.all().delete()
+        queries.append(len(captured))
+    post.refresh_from_db()
+    assert post.comment_count == 0
+    assert queries[0] == queries[1], (
+        "Убедитесь, что при удалении комментариев счётчик публикации "
+        "обновляется одним запросом, а не на каждый комментарий."
+    )
@@ -0,0 +1,32 @@
+import re
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_detail_ships_first_comments_and_fragment_continues(
+        mixer, client, post_with_published_location
+):
+    from blog.views import COMMENTS_PAGINATED_BY
+
+    post = post_with_published_location
+    mixer.cycle(COMMENTS_PAGINATED_BY + 5).blend("blog.Comment", post=post)
+
+    response = client.get(f"/posts/{post.id}/")
+    assert len(response.context["comments"]) == COMMENTS_PAGINATED_BY, (
+        "Убедитесь, что страница публикации показывает только первую "
+        "порцию комментариев."
+    )
+    more = re.search(
+        r'href="(/posts/\d+/comments/\?after=[\w-]+)"',
+        response.content.decode(),
+    )
+    assert more, "Убедитесь, что есть ссылка на следующие комментарии."
+
+    fragment = client.get(more.group(1))
+    assert fragment.status_code == 200
+    assert len(fragment.context["comments"]) == 5
+    assert "<html" not in fragment.content.decode()
+    shown = {c.id for c in response.context["comments"]}
+    assert not shown & {c.id for c in fragment.context["comments"]}
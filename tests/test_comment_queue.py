@@ -0,0 +1,128 @@
+import threading
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.comment_queue import enqueue, flush, pending_comments
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def queue_path(settings, tmp_path):
+    settings.BLOG_COMMENT_QUEUE = str(tmp_path / "comments.jsonl")
+    return tmp_path
+
+
+def test_queued_comment_visible_to_author_then_flushed(
+        queue_path, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    response = user_client.post(
+        f"/posts/{post.id}/comment/", data={"text": "Из очереди"}
+    )
+    assert response.status_code == 302
+    assert not Comment.objects.exists(), (
+        "Убедитесь, что при включённой очереди комментарий не "
+        "записывается в базу сразу."
+    )
+    content = user_client.get(f"/posts/{post.id}/").content.decode()
+    assert "Из очереди" in content, (
+        "Убедитесь, что автор сразу видит свой комментарий из очереди."
+    )
+
+    call_command("flush_comments", once=True, stdout=StringIO())
+    post.refresh_from_db()
+    assert Comment.objects.get().text == "Из очереди"
+    assert post.comment_count == 1, (
+        "Убедитесь, что при записи пачки обновляется счётчик комментариев."
+    )
+    assert list(queue_path.iterdir()) == []
+    content = user_client.get(f"/posts/{post.id}/").content.decode()
+    assert content.count("Из очереди") == 1
+
+
+def test_concurrent_enqueue_loses_nothing(
+        queue_path, user, post_with_published_location
+):
+    post = post_with_published_location
+
+    def write(number):
+        for index in range(50):
+            enqueue(Comment(
+                post=post, author=user, text=f"{number}-{index}",
+                created_at=timezone.now(),
+            ))
+
+    writers = [
+        threading.Thread(target=write, args=(number,)) for number in range(4)
+    ]
+    for writer in writers:
+        writer.start()
+    written = 0
+    while any(writer.is_alive() for writer in writers):
+        written += flush()
+    for writer in writers:
+        writer.join()
+    written += flush()
+    assert written == Comment.objects.count() == 200, (
+        "Убедитесь, что комментарии не теряются, если очередь забирается "
+        "во время записи."
+    )
+
+
+def queued(post, author, text):
+    return Comment(
+        post=post, author=author, text=text, created_at=timezone.now()
+    )
+
+
+def test_flush_after_crash_writes_nothing_twice(
+        queue_path, monkeypatch, user, another_user,
+        post_with_published_location
+):
+    post = post_with_published_location
+    enqueue(queued(post, user, "Первый"))
+    enqueue(queued(post, another_user, "От удалённого автора"))
+    another_user.delete()
+
+    def crash(path):
+        raise OSError("сбой перед удалением файла")
+
+    with monkeypatch.context() as patch:
+        patch.setattr("blog.comment_queue.os.remove", crash)
+        with pytest.raises(OSError):
+            flush()
+    assert flush() == 0, (
+        "Убедитесь, что после сбоя уже записанные комментарии из очереди "
+        "не записываются повторно."
+    )
+    post.refresh_from_db()
+    assert list(Comment.objects.values_list("text", flat=True)) == [
+        "Первый"
+    ], (
+        "Убедитесь, что комментарии удалённых авторов не записываются."
+    )
+    assert post.comment_count == 1
+
+
+def test_pending_comments_read_incrementally(
+        queue_path, user, another_user, post_with_published_location
+):
+    post = post_with_published_location
+    enqueue(queued(post, user, "Первый"))
+    enqueue(queued(post, another_user, "Чужой"))
+    assert [c.text for c in pending_comments(post, user)] == ["Первый"]
+    enqueue(queued(post, user, "Второй"))
+    assert [c.text for c in pending_comments(post, user)] == [
+        "Первый", "Второй"
+    ], (
+        "Убедитесь, что новые строки очереди видны автору."
+    )
+    flush()
+    assert pending_comments(post, user) == []
+    enqueue(queued(post, user, "Третий"))
+    assert [c.text for c in pending_comments(post, user)] == ["Третий"]
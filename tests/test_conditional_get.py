@@ -0,0 +1,67 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize("client_name", ["client", "user_client"])
+def test_unchanged_pages_answer_not_modified(
+        request, client_name, post_with_published_location
+):
+    client = request.getfixturevalue(client_name)
+    post = post_with_published_location
+    for url in ("/", f"/posts/{post.id}/", f"/profile/{post.author}/"):
+        response = client.get(url)
+        assert response.has_header("ETag") and response.has_header(
+            "Last-Modified"
+        ), f"Убедитесь, что страница `{url}` отдаёт ETag и Last-Modified."
+        repeated = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert repeated.status_code == 304, (
+            f"Убедитесь, что неизменившаяся страница `{url}` отвечает 304."
+        )
+        assert not repeated.content
+
+
+def test_not_modified_skips_rendering(
+        user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    etag = user_client.get(url)["ETag"]
+    repeated = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert repeated.status_code == 304
+    assert not repeated.templates, (
+        "Убедитесь, что ответ 304 формируется без отрисовки шаблонов."
+    )
+
+
+def test_new_comment_changes_validators(
+        client, user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    etag = client.get(url)["ETag"]
+    user_client.post(f"{url}comment/", data={"text": "Комментарий"})
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+        "Убедитесь, что новый комментарий меняет ETag страницы поста."
+    )
+
+
+@pytest.mark.parametrize("url", ["/posts/99999/", "/posts/99999/comments/"])
+def test_missing_post_answers_not_found(client, url):
+    response = client.get(url, HTTP_IF_NONE_MATCH="*")
+    assert response.status_code == 404, (
+        "Убедитесь, что для несуществующего поста условный запрос "
+        "получает 404, а не 304."
+    )
+
+
+def test_hidden_post_answers_not_found(
+        client, user_client, future_posts
+):
+    url = f"/posts/{future_posts[0].id}/"
+    etag = user_client.get(url)["ETag"]
+    assert user_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    for if_none_match in (etag, "*"):
+        response = client.get(url, HTTP_IF_NONE_MATCH=if_none_match)
+        assert response.status_code == 404, (
+            "Убедитесь, что скрытый пост отвечает 404 на условный запрос "
+            "пользователя, которому он не виден."
+        )
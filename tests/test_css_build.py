@@ -0,0 +1,72 @@
+import pytest
+from django.core.management import call_command
+
+from pages.css import purge_css
+
+CSS = (
+    '@charset "UTF-8";:root{--x:1}body{margin:0}table{width:100%}'
+    '.btn,.card{color:red}.nav>.btn:not(.active){top:0}'
+    '@media (min-width:576px){.card{padding:0}.unused{padding:1px}}'
+    '@keyframes spin{to{transform:rotate(360deg)}}'
+)
+
+
+def test_purge_keeps_only_used_classes():
+    purged = purge_css(CSS, {"card"})
+    assert ".card{color:red}" in purged
+    assert ".btn" not in purged and ".unused" not in purged, (
+        "Убедитесь, что из стилей удаляются правила с неиспользуемыми "
+        "классами."
+    )
+    assert "@media (min-width:576px){.card{padding:0}}" in purged
+    assert purged.startswith('@charset "UTF-8";:root{--x:1}body{margin:0}')
+    assert "@keyframes spin{to{transform:rotate(360deg)}}" in purged
+
+
+def test_purge_filters_elements_for_critical_css():
+    purged = purge_css(CSS, {"card"}, {"html", "body"})
+    assert "body{margin:0}" in purged
+    assert "table" not in purged, (
+        "Убедитесь, что в критические стили не попадают правила для "
+        "элементов, которых нет на первом экране."
+    )
+
+
+@pytest.mark.django_db
+def test_base_inlines_critical_css(client, settings, tmp_path):
+    settings.STATICFILES_DIRS = [tmp_path]
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "bootstrap.min.css").write_text(
+        ".navbar{display:flex}.table{width:100%}", encoding="utf-8"
+    )
+    call_command("build_css", verbosity=0)
+    assert (tmp_path / "css" / "critical.css").read_text() == (
+        ".navbar{display:flex}"
+    )
+
+    content = client.get("/").content.decode()
+    assert "<style>" in content and 'rel="preload"' in content, (
+        "Убедитесь, что критические стили встраиваются в <head>, "
+        "а основная таблица стилей загружается без блокировки отрисовки."
+    )
+    assert "bootstrap.purged.css" in content
+    assert "cdn.jsdelivr.net" not in content
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "assets, expected, unexpected",
+    [
+        ("local", '<link rel="stylesheet" href="/static/css/bootstrap.min',
+         "cdn.jsdelivr.net"),
+        ("cdn", "cdn.jsdelivr.net", "/static/css/bootstrap"),
+    ],
+)
+def test_bootstrap_assets_mode(client, settings, assets, expected, unexpected):
+    settings.BOOTSTRAP_ASSETS = assets
+    settings.CSS_CRITICAL_INLINE = False
+    content = client.get("/").content.decode()
+    assert expected in content and unexpected not in content, (
+        "Убедитесь, что настройка BOOTSTRAP_ASSETS выбирает, откуда "
+        "подключается Bootstrap: из своей статики или с CDN."
+    )
@@ -0,0 +1,70 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+
+from blog.models import Comment, Post
+
+pytestmark = [
+    pytest.mark.django_db(databases=["default", "comments", "sessions"])
+]
+
+
+@pytest.fixture(autouse=True)
+def split_databases(settings):
+    settings.BLOG_SPLIT_DATABASES = True
+
+
+def test_comments_stored_in_own_database(
+        user, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Привет"})
+    assert Comment.objects.using("comments").count() == 1, (
+        "Убедитесь, что при включённом BLOG_SPLIT_DATABASES комментарии "
+        "сохраняются в базу comments."
+    )
+    assert not Comment.objects.using("default").exists()
+    post.refresh_from_db()
+    assert post.comment_count == 1
+
+    response = user_client.get(f"/posts/{post.id}/")
+    assert response.status_code == 200
+    assert user.username in response.content.decode(), (
+        "Убедитесь, что авторы комментариев из отдельной базы "
+        "показываются на странице поста."
+    )
+
+    Post.objects.update(comment_count=0)
+    call_command("recount_comments", stdout=StringIO())
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что recount_comments считает комментарии из "
+        "отдельной базы."
+    )
+
+    post.delete()
+    assert not Comment.objects.using("comments").exists(), (
+        "Убедитесь, что комментарии из отдельной базы удаляются вместе "
+        "с постом."
+    )
+
+
+def test_single_database_keeps_constraints(
+        settings, mixer, post_with_published_location
+):
+    settings.BLOG_SPLIT_DATABASES = False
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    Post.objects.filter(pk=post.pk).delete()
+    assert not Comment.objects.exists(), (
+        "Убедитесь, что в одной базе комментарии удаляются каскадом "
+        "вместе с постом."
+    )
+    with pytest.raises(IntegrityError), transaction.atomic():
+        Comment.objects.create(
+            post_id=post.pk, author=post.author, text="Без поста"
+        )
+        # Ограничения отложенные: проверяются при фиксации транзакции.
+        connection.check_constraints(table_names=["blog_comment"])
@@ -0,0 +1,60 @@
+import hashlib
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def make_jpeg(size):
+    buffer = BytesIO()
+    Image.new("RGB", size, color=(10, 20, 30)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def test_form_stores_image_metadata(
+        user_client, published_category, published_location
+):
+    content = make_jpeg((120, 80))
+    user_client.post("/posts/create/", data={
+        "title": "С картинкой",
+        "text": "Текст",
+        "pub_date": "2020-01-01T10:00",
+        "category": published_category.id,
+        "location": published_location.id,
+        "is_published": True,
+        "image": SimpleUploadedFile("meta.jpg", content, "image/jpeg"),
+    })
+    post = Post.objects.get(title="С картинкой")
+    assert (post.image_width, post.image_height) == (120, 80), (
+        "Убедитесь, что при сохранении формы публикации запоминаются "
+        "размеры изображения."
+    )
+    with post.image.open("rb") as stored:
+        stored_content = stored.read()
+    assert post.image_bytes == len(stored_content)
+    assert post.image_hash == hashlib.sha256(stored_content).hexdigest()
+
+
+def test_backfill_image_metadata(post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(
+        image_width=None, image_height=None, image_bytes=None, image_hash=""
+    )
+    call_command("backfill_image_metadata", stdout=StringIO())
+    post.refresh_from_db()
+    assert (post.image_width, post.image_height) == (100, 100), (
+        "Убедитесь, что команда `backfill_image_metadata` заполняет "
+        "размеры изображений существующих публикаций."
+    )
+    assert post.image_bytes and len(post.image_hash) == 64
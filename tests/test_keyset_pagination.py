@@ -0,0 +1,44 @@
+import re
+
+import pytest
+from django.test import override_settings
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _titles(response):
+    return [post.title for post in response.context["page_obj"]]
+
+
+@override_settings(BLOG_KEYSET_PAGINATION=True)
+def test_keyset_pagination_walks_feed(
+        client, many_posts_with_published_locations
+):
+    first = client.get("/")
+    assert len(_titles(first)) == N_PER_PAGE
+    after = re.search(r"\?after=([\w-]+)", first.content.decode())
+    assert after, (
+        "Убедитесь, что при курсорной пагинации на странице есть ссылка "
+        "на следующую страницу с параметром `after`."
+    )
+
+    second = client.get(f"/?after={after.group(1)}")
+    assert len(_titles(second)) == N_PER_PAGE
+    assert not set(_titles(first)) & set(_titles(second)), (
+        "Убедитесь, что страницы курсорной пагинации не пересекаются."
+    )
+    assert not second.context["page_obj"].has_next()
+
+    before = second.context["page_obj"].previous_cursor
+    back = client.get(f"/?before={before}")
+    assert _titles(back) == _titles(first), (
+        "Убедитесь, что переход по параметру `before` возвращает "
+        "предыдущую страницу."
+    )
+
+
+@override_settings(BLOG_KEYSET_PAGINATION=True)
+def test_keyset_pagination_rejects_bad_cursor(client):
+    assert client.get("/?after=not-a-cursor").status_code == 404
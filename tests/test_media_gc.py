@@ -0,0 +1,65 @@
+import os
+import time
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def media_dir(tmp_path, monkeypatch):
+    storage = Post._meta.get_field("image").storage
+    monkeypatch.setattr(storage, "location", str(tmp_path))
+    return tmp_path
+
+
+def make_file(media_dir, name, age_hours=48):
+    path = media_dir / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x")
+    mtime = time.time() - age_hours * 3600
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_collects_only_old_unreferenced_files(mixer, user, media_dir):
+    post = mixer.blend("blog.Post", author=user)
+    Post.objects.filter(pk=post.pk).update(image="img/ab/cd/kept.jpg")
+    kept = [
+        make_file(media_dir, "img/ab/cd/kept.jpg"),
+        make_file(media_dir, "img/ab/cd/kept.w320.webp"),
+        make_file(media_dir, "img/fresh.jpg", age_hours=1),
+    ]
+    removed = [
+        make_file(media_dir, "img/ab/cd/lost.jpg"),
+        make_file(media_dir, "img/ab/cd/lost.w320.jpeg"),
+        make_file(media_dir, "img/kept.w320.webp"),
+    ]
+
+    call_command("collect_media_garbage", dry_run=True, chunk_size=2)
+    assert all(path.exists() for path in kept + removed), (
+        "Убедитесь, что в режиме --dry-run файлы не удаляются."
+    )
+
+    call_command("collect_media_garbage", chunk_size=2)
+    assert all(path.exists() for path in kept), (
+        "Убедитесь, что не удаляются файлы, на которые ссылаются "
+        "публикации, их варианты и недавно загруженные файлы."
+    )
+    assert not any(path.exists() for path in removed), (
+        "Убедитесь, что удаляются старые файлы без ссылок и варианты "
+        "изображений без оригинала."
+    )
+
+
+def test_quarantine_moves_files(mixer, media_dir, tmp_path_factory):
+    quarantine = tmp_path_factory.mktemp("quarantine")
+    orphan = make_file(media_dir, "img/orphan.png")
+
+    call_command("collect_media_garbage", quarantine=str(quarantine))
+    assert not orphan.exists() and (quarantine / "img/orphan.png").exists(), (
+        "Убедитесь, что с --quarantine файлы переносятся в карантин."
+    )
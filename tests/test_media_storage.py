@@ -0,0 +1,82 @@
+import hashlib
+import os
+from io import BytesIO
+
+import pytest
+from django.core.files.images import ImageFile
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.BLOG_IMAGE_RELEASE_GRACE = 0
+
+
+@pytest.fixture
+def image_bytes():
+    buffer = BytesIO()
+    Image.new("RGB", (60, 40), color=(1, 2, 3)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def blend_post(mixer, user, content, name):
+    return mixer.blend(
+        "blog.Post", author=user, image=ImageFile(BytesIO(content), name=name)
+    )
+
+
+def test_identical_uploads_stored_once(
+        mixer, user, image_bytes, django_capture_on_commit_callbacks
+):
+    first = blend_post(mixer, user, image_bytes, "first.png")
+    second = blend_post(mixer, user, image_bytes, "second.png")
+    digest = hashlib.sha256(image_bytes).hexdigest()
+    assert first.image.name == second.image.name == (
+        f"img/{digest[:2]}/{digest[2:4]}/{digest}.png"
+    ), (
+        "Убедитесь, что файлы изображений называются по хэшу содержимого "
+        "и одинаковые загрузки хранятся одним файлом."
+    )
+    storage = first.image.storage
+
+    with django_capture_on_commit_callbacks(execute=True):
+        first.delete()
+    assert storage.exists(second.image.name), (
+        "Убедитесь, что файл не удаляется, пока на него ссылается "
+        "другая публикация."
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        second.image = None
+        second.save()
+    assert not storage.exists(first.image.name), (
+        "Убедитесь, что файл удаляется, когда на него больше не ссылается "
+        "ни одна публикация."
+    )
+
+
+def test_reupload_keeps_file_alive(
+        mixer, user, image_bytes, settings,
+        django_capture_on_commit_callbacks
+):
+    first = blend_post(mixer, user, image_bytes, "first.png")
+    path = first.image.path
+    os.utime(path, (0, 0))
+    second = blend_post(mixer, user, image_bytes, "second.png")
+    assert os.stat(path).st_mtime > 0, (
+        "Убедитесь, что повторная загрузка существующего файла обновляет "
+        "время его изменения: по нему команда очистки определяет "
+        "брошенные файлы."
+    )
+
+    settings.BLOG_IMAGE_RELEASE_GRACE = 60
+    with django_capture_on_commit_callbacks(execute=True):
+        first.delete()
+        second.delete()
+    assert os.path.exists(path), (
+        "Убедитесь, что недавно загруженный файл не удаляется сразу: "
+        "на него может сослаться публикация из незавершённой транзакции."
+    )
@@ -0,0 +1,76 @@
+import pytest
+
+
+@pytest.fixture
+def media_file(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    (tmp_path / "img").mkdir()
+    (tmp_path / "img" / "photo.jpg").write_bytes(b"0123456789")
+    return "/media/img/photo.jpg"
+
+
+def test_media_full_and_conditional(client, media_file):
+    response = client.get(media_file)
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content) == b"0123456789"
+    assert response["Accept-Ranges"] == "bytes"
+    assert response.has_header("Last-Modified"), (
+        "Убедитесь, что медиафайлы отдаются с заголовком Last-Modified."
+    )
+
+    response = client.get(media_file, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 304, (
+        "Убедитесь, что при совпадении ETag медиафайл не передаётся "
+        "повторно и возвращается ответ 304."
+    )
+
+
+def test_media_range(client, media_file):
+    response = client.get(media_file, HTTP_RANGE="bytes=2-5")
+    assert response.status_code == 206
+    assert b"".join(response.streaming_content) == b"2345"
+    assert response["Content-Range"] == "bytes 2-5/10"
+    assert response["Content-Length"] == "4"
+
+    response = client.get(media_file, HTTP_RANGE="bytes=-3")
+    assert b"".join(response.streaming_content) == b"789"
+
+    response = client.get(media_file, HTTP_RANGE="bytes=20-")
+    assert response.status_code == 416, (
+        "Убедитесь, что на диапазон за пределами файла возвращается 416."
+    )
+
+    response = client.get(
+        media_file, HTTP_RANGE="bytes=2-5", HTTP_IF_RANGE='"stale"'
+    )
+    assert response.status_code == 200, (
+        "Убедитесь, что при устаревшем If-Range файл отдаётся целиком."
+    )
+
+
+@pytest.mark.parametrize(
+    "backend, header, value",
+    [
+        ("x-accel-redirect", "X-Accel-Redirect",
+         "/protected-media/img/photo.jpg"),
+        ("x-sendfile", "X-Sendfile", None),
+    ],
+)
+def test_media_offloaded_to_proxy(
+        client, settings, media_file, backend, header, value
+):
+    settings.MEDIA_ACCEL = backend
+    response = client.get(media_file)
+    assert response.status_code == 200
+    assert response.has_header(header), (
+        f"Убедитесь, что при MEDIA_ACCEL = {backend!r} передача файла "
+        f"поручается прокси через заголовок {header}."
+    )
+    expected = value or str(settings.MEDIA_ROOT / "img" / "photo.jpg")
+    assert response[header] == expected
+    assert not response.content
+
+
+def test_media_outside_root_not_served(client, media_file):
+    assert client.get("/media/../settings.py").status_code == 404
+    assert client.get("/media/img/missing.jpg").status_code == 404
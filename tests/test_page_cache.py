@@ -0,0 +1,51 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_anonymous_pages_are_cached(
+        client, post_with_published_location, django_assert_num_queries
+):
+    post = post_with_published_location
+    for url in ("/", f"/posts/{post.id}/"):
+        first = client.get(url)
+        with django_assert_num_queries(0):
+            second = client.get(url)
+        assert second.content == first.content, (
+            "Убедитесь, что анонимному читателю повторно отдаётся "
+            "сохранённая страница."
+        )
+
+
+def test_writes_invalidate_affected_pages(
+        mixer, client, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    client.get(url)
+    client.get("/")
+
+    user_client.post(f"{url}comment/", data={"text": "Свежий комментарий"})
+    assert "Свежий комментарий" in client.get(url).content.decode(), (
+        "Убедитесь, что новый комментарий сбрасывает кэш страницы поста."
+    )
+    assert "Комментарии (1)" in client.get("/").content.decode(), (
+        "Убедитесь, что новый комментарий сбрасывает кэш главной страницы."
+    )
+
+    post.title = "Новый заголовок"
+    post.save()
+    assert "Новый заголовок" in client.get(
+        f"/profile/{post.author.username}/"
+    ).content.decode()
+
+
+def test_authenticated_pages_are_not_cached(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get(f"/posts/{post.id}/")
+    response = user_client.get(f"/posts/{post.id}/")
+    assert response.context is not None, (
+        "Убедитесь, что страницы авторизованных пользователей не кэшируются."
+    )
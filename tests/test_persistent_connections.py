@@ -0,0 +1,71 @@
+import importlib
+
+import pytest
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+from blogicum import warmup
+
+
+@pytest.fixture
+def file_connections(tmp_path, monkeypatch, settings):
+    settings.BLOG_SPLIT_DATABASES = False
+    opened = {
+        alias: DatabaseWrapper(
+            {
+                **warmup.connections[alias].settings_dict,
+                "NAME": str(tmp_path / f"{alias}.sqlite3"),
+                "CONN_MAX_AGE": 600,
+            },
+            alias=alias,
+        )
+        for alias in ("default", "comments", "sessions")
+    }
+    monkeypatch.setattr(warmup, "connections", opened)
+    yield opened
+    for connection in opened.values():
+        connection.close()
+
+
+def test_production_settings():
+    production = importlib.import_module("blogicum.settings_production")
+    assert not production.DEBUG
+    for alias in ("default", "comments", "sessions"):
+        database = production.DATABASES[alias]
+        assert database["CONN_MAX_AGE"] > 0, (
+            "Убедитесь, что в продакшене соединения с базами постоянные."
+        )
+        assert database["CONN_HEALTH_CHECKS"]
+    assert production.DATABASES["replica"]["CONN_MAX_AGE"] == 0, (
+        "Соединение со снимком не должно быть постоянным."
+    )
+    development = importlib.import_module("blogicum.settings")
+    assert development.DATABASES["default"]["CONN_MAX_AGE"] == 0, (
+        "Настройки продакшена не должны менять настройки разработки."
+    )
+    assert production.STORAGES["staticfiles"] == (
+        development.staticfiles_storage(debug=False)
+    ), "Убедитесь, что в продакшене статика собирается с хэшами и сжатием."
+    assert development.STORAGES["staticfiles"] == (
+        development.staticfiles_storage(debug=True)
+    )
+
+
+@pytest.mark.django_db(databases=["default", "comments", "sessions"])
+def test_warm_up_opens_used_connections(file_connections, settings):
+    warmup.warm_up_connections()
+    assert file_connections["default"].connection is not None, (
+        "Убедитесь, что прогрев открывает соединение с основной базой."
+    )
+    assert file_connections["comments"].connection is None, (
+        "Без разделения баз прогрев не должен открывать другие базы."
+    )
+    warmup.close_connections()
+    assert file_connections["default"].connection is None
+
+    settings.BLOG_SPLIT_DATABASES = True
+    file_connections["sessions"].settings_dict["CONN_MAX_AGE"] = 0
+    warmup.warm_up_connections()
+    assert file_connections["comments"].connection is not None
+    assert file_connections["sessions"].connection is None, (
+        "Непостоянные соединения прогревать бесполезно."
+    )
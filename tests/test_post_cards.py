@@ -0,0 +1,44 @@
+import pytest
+from django.template import Context, Template
+
+from blog.cache import post_card_key
+
+pytestmark = [pytest.mark.django_db]
+
+CARDS = Template(
+    "{% load blog_tags %}{% post_cards posts as cards %}"
+    "{% for card in cards %}{{ card }}{% endfor %}"
+)
+
+
+def test_post_card_key_follows_related_changes(post_with_published_location):
+    post = post_with_published_location
+    key = post_card_key(post)
+    assert post_card_key(post) == key
+    for change in (
+        lambda: setattr(post.category, "title", "Другая категория"),
+        lambda: setattr(post.location, "name", "Другое место"),
+        lambda: setattr(post.author, "username", "renamed"),
+        lambda: setattr(post, "comment_count", post.comment_count + 1),
+    ):
+        change()
+        new_key = post_card_key(post)
+        assert new_key != key, (
+            "Убедитесь, что версия карточки поста меняется при изменении "
+            "поста, его категории, местоположения, автора и числа "
+            "комментариев."
+        )
+        key = new_key
+
+
+def test_post_cards_render_only_missing(
+        post_with_published_location, django_assert_num_queries
+):
+    post = post_with_published_location
+    first = CARDS.render(Context({"posts": [post]}))
+    assert post.title in first
+    post.title = "Изменённый заголовок"
+    second = CARDS.render(Context({"posts": [post]}))
+    assert "Изменённый заголовок" in second
+    with django_assert_num_queries(0):
+        assert CARDS.render(Context({"posts": [post]})) == second
@@ -0,0 +1,52 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize(
+    ("url_template", "max_queries"),
+    [
+        # Форма поста дополнительно выбирает категории и местоположения.
+        ("/posts/{post.id}/edit/", 5),
+        ("/posts/{post.id}/delete/", 3),
+        ("/posts/{post.id}/edit_comment/{comment.id}/", 3),
+        ("/posts/{post.id}/delete_comment/{comment.id}/", 3),
+    ],
+)
+def test_edit_pages_load_object_once(
+        mixer, user, user_client, post_with_published_location,
+        django_assert_max_num_queries, url_template, max_queries
+):
+    post = post_with_published_location
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    url = url_template.format(post=post, comment=comment)
+    # Сессия, пользователь и один запрос объекта.
+    with django_assert_max_num_queries(max_queries):
+        response = user_client.get(url)
+    assert response.status_code == 200
+
+
+def test_foreign_edit_redirects_without_refetch(
+        another_user_client, post_with_published_location,
+        django_assert_max_num_queries
+):
+    post = post_with_published_location
+    with django_assert_max_num_queries(3):
+        response = another_user_client.get(f"/posts/{post.id}/edit/")
+    assert response.status_code == 302
+
+
+def test_post_detail_query_budget(
+        mixer, client, user_client, post_with_published_location,
+        django_assert_num_queries
+):
+    post = post_with_published_location
+    mixer.cycle(5).blend("blog.Comment", post=post)
+    # Валидаторы условного запроса, пост со связанными объектами
+    # и комментарии с авторами.
+    with django_assert_num_queries(3):
+        response = client.get(f"/posts/{post.id}/")
+    assert response.status_code == 200
+    # Для автора добавляются сессия и пользователь.
+    with django_assert_num_queries(5):
+        assert user_client.get(f"/posts/{post.id}/").status_code == 200
@@ -0,0 +1,41 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.db.models import Q
+from django.utils import timezone
+
+from blog.models import Comment, Post
+from blog.utils import filter_published_posts
+
+pytestmark = [pytest.mark.django_db]
+
+FULL_SCAN = re.compile(r"\bSCAN blog_(post|comment)\b(?! USING)")
+
+
+def assert_indexed(queryset, name):
+    plan = queryset.explain()
+    assert not FULL_SCAN.search(plan), (
+        f"Запрос «{name}» выполняет полный просмотр таблицы:\n{plan}"
+    )
+    assert "TEMP B-TREE" not in plan, (
+        f"Запрос «{name}» сортирует результат во временном B-дереве:\n{plan}"
+    )
+
+
+def test_feed_queries_use_indexes(user, published_category):
+    cursor_date = timezone.now() - timedelta(days=1)
+    feeds = {
+        "лента": filter_published_posts(Post.objects.all()),
+        "категория": filter_published_posts(published_category.posts.all()),
+        "профиль": filter_published_posts(user.posts.all()),
+        "профиль автора": user.posts.all(),
+        "курсор": filter_published_posts(Post.objects.all()).filter(
+            Q(pub_date__lt=cursor_date) | Q(pub_date=cursor_date, pk__lt=1)
+        ).order_by("-pub_date", "-pk"),
+        "комментарии": Comment.objects.filter(
+            post_id=1
+        ).select_related("author"),
+    }
+    for name, queryset in feeds.items():
+        assert_indexed(queryset[:10], name)
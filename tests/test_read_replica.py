@@ -0,0 +1,65 @@
+import sqlite3
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.fixture
+def replica(settings, tmp_path):
+    settings.BLOG_READ_REPLICA = True
+    settings.BLOG_REPLICA_SNAPSHOT = tmp_path / "replica.sqlite3"
+    settings.BLOG_REPLICA_SNAPSHOT.touch()
+    return connections["replica"]
+
+
+# В тестах снимок — зеркало основной базы через отдельное соединение,
+# поэтому нужны зафиксированные транзакции.
+@pytest.mark.django_db(transaction=True, databases=["default", "replica"])
+def test_reads_go_to_replica_until_user_writes(
+        replica, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    with CaptureQueriesContext(replica) as queries:
+        assert user_client.get(f"/posts/{post.id}/").status_code == 200
+    assert queries, (
+        "Убедитесь, что страница поста читается из снимка базы."
+    )
+
+    response = user_client.post(
+        f"/posts/{post.id}/comment/", data={"text": "Свежий"}
+    )
+    assert "recent_write" in response.cookies, (
+        "Убедитесь, что после изменяющего запроса ставится cookie, "
+        "закрепляющая чтение за основной базой."
+    )
+    with CaptureQueriesContext(replica) as queries:
+        content = user_client.get(f"/posts/{post.id}/").content.decode()
+    assert not queries and "Свежий" in content, (
+        "Убедитесь, что автор изменений читает из основной базы и видит "
+        "свои правки."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_publish_snapshot(settings, tmp_path, post_with_published_location):
+    settings.BLOG_REPLICA_SNAPSHOT = tmp_path / "replica.sqlite3"
+    call_command("publish_snapshot", stdout=StringIO())
+    snapshot = sqlite3.connect(
+        f"{settings.BLOG_REPLICA_SNAPSHOT.as_uri()}?mode=ro&immutable=1",
+        uri=True,
+    )
+    try:
+        assert snapshot.execute(
+            "SELECT title FROM blog_post"
+        ).fetchall() == [(post_with_published_location.title,)], (
+            "Убедитесь, что снимок содержит данные основной базы."
+        )
+        assert snapshot.execute("PRAGMA journal_mode").fetchone() == (
+            "delete",
+        )
+    finally:
+        snapshot.close()
+    assert not (tmp_path / "replica.sqlite3.tmp").exists()
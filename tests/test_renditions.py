@@ -0,0 +1,132 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from django.template import Context, Template
+from PIL import Image
+
+from blog.images import rendition_names
+from blog.jobs import render_image
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.BLOG_IMAGE_RELEASE_GRACE = 0
+
+
+@pytest.fixture
+def post_with_queued_image(
+        mixer, user, published_category, django_capture_on_commit_callbacks
+):
+    buffer = BytesIO()
+    Image.new("RGB", (1400, 700), color=(73, 109, 137)).save(buffer, "JPEG")
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        image=ImageFile(buffer, name="large.jpg"),
+    )
+    yield post
+    # Удаление последнего поста удаляет файл и его варианты.
+    with django_capture_on_commit_callbacks(execute=True):
+        type(post).objects.filter(pk=post.pk).delete()
+
+
+@pytest.fixture
+def post_with_large_image(post_with_queued_image):
+    post = post_with_queued_image
+    call_command(
+        "process_image_jobs", "--once", "--workers=1", stdout=StringIO()
+    )
+    post.refresh_from_db()
+    return post
+
+
+def test_renditions_generated_without_upscaling(post_with_large_image):
+    image = post_with_large_image.image
+    for name in rendition_names(image.name):
+        assert image.storage.exists(name), (
+            f"Убедитесь, что для изображения создан вариант `{name}`."
+        )
+        with image.storage.open(name) as rendition:
+            assert Image.open(rendition).width < 1400
+
+
+RESPONSIVE_IMAGE = Template(
+    "{% load blog_tags %}"
+    "{% responsive_image post.image ready=post.renditions_ready %}"
+)
+
+
+def test_original_shown_until_renditions_ready(post_with_queued_image):
+    post = post_with_queued_image
+    assert not post.renditions_ready
+    assert post.image_jobs.filter(status="pending").exists(), (
+        "Убедитесь, что при сохранении изображения создаётся задание "
+        "фоновой обработки."
+    )
+    html = RESPONSIVE_IMAGE.render(Context({"post": post}))
+    assert "srcset" not in html, (
+        "Убедитесь, что до готовности копий выводится только оригинал."
+    )
+
+
+def test_responsive_image_tag(post_with_large_image):
+    assert post_with_large_image.renditions_ready
+    assert post_with_large_image.image_jobs.get().status == "done"
+    html = RESPONSIVE_IMAGE.render(Context({"post": post_with_large_image}))
+    assert 'type="image/webp"' in html
+    assert ".w320.jpeg 320w" in html and "1400w" in html
+    assert 'width="1400" height="700"' in html
+    assert 'loading="lazy"' in html
+
+
+def test_renditions_removed_with_post(
+        post_with_large_image, django_capture_on_commit_callbacks
+):
+    image = post_with_large_image.image
+    with django_capture_on_commit_callbacks(execute=True):
+        post_with_large_image.delete()
+    assert not any(
+        image.storage.exists(name) for name in rendition_names(image.name)
+    )
+
+
+def test_renditions_keep_names_of_legacy_images(mixer, user, settings):
+    # Изображения, загруженные до хранения по хэшу, лежат под своими
+    # именами.
+    image_dir = settings.MEDIA_ROOT / "img"
+    image_dir.mkdir()
+    Image.new("RGB", (700, 350)).save(image_dir / "photo.jpg", "JPEG")
+    post = mixer.blend("blog.Post", author=user)
+    type(post).objects.filter(pk=post.pk).update(image="img/photo.jpg")
+    post.refresh_from_db()
+    render_image(post.image.name)
+    for name in rendition_names("img/photo.jpg", 700):
+        assert post.image.storage.exists(name), (
+            "Убедитесь, что варианты изображения со старым именем "
+            f"сохраняются под именем `{name}`, которое ищут шаблоны."
+        )
+
+
+@pytest.mark.parametrize("command, args", [
+    ("make_renditions", []),
+    ("process_image_jobs", ["--once", "--workers=1"]),
+])
+def test_unreadable_image_fails_job(post_with_queued_image, command, args):
+    post = post_with_queued_image
+    with open(post.image.path, "wb") as image_file:
+        image_file.write(b"not an image")
+    call_command(command, *args, stdout=StringIO(), stderr=StringIO())
+    job = post.image_jobs.get()
+    assert job.status == "failed" and job.attempts == 1, (
+        f"Убедитесь, что `{command}` сразу помечает задание неразборчивого "
+        "изображения как неудавшееся."
+    )
+    assert "UnidentifiedImageError" in job.error
+    post.refresh_from_db()
+    assert not post.renditions_ready
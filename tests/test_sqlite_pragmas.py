@@ -0,0 +1,56 @@
+import time
+
+import pytest
+from django.db import connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def file_connections(tmp_path):
+    settings_dict = {
+        **connections["default"].settings_dict,
+        "NAME": str(tmp_path / "db.sqlite3"),
+    }
+    opened = [
+        DatabaseWrapper(settings_dict, alias=f"pragmas_{number}")
+        for number in range(2)
+    ]
+    yield opened
+    for connection in opened:
+        connection.close()
+
+
+def test_pragmas_applied_on_connect(file_connections):
+    with file_connections[0].cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode")
+        assert cursor.fetchone()[0] == "wal", (
+            "Убедитесь, что при подключении к SQLite включается режим WAL."
+        )
+        cursor.execute("PRAGMA busy_timeout")
+        assert cursor.fetchone()[0] == 5000
+        cursor.execute("PRAGMA synchronous")
+        assert cursor.fetchone()[0] == 1
+
+
+def test_readers_not_blocked_by_writer(file_connections):
+    writer, reader = file_connections
+    with writer.cursor() as cursor:
+        cursor.execute("CREATE TABLE item (id integer PRIMARY KEY)")
+        cursor.execute("INSERT INTO item VALUES (1)")
+    with writer.cursor() as cursor:
+        # Эксклюзивная блокировка, как у писателя в момент фиксации:
+        # в журнальном режиме DELETE читатель ждал бы её снятия.
+        cursor.execute("BEGIN EXCLUSIVE")
+        cursor.execute("INSERT INTO item VALUES (2)")
+        try:
+            started = time.monotonic()
+            with reader.cursor() as reader_cursor:
+                reader_cursor.execute("SELECT count(*) FROM item")
+                assert reader_cursor.fetchone()[0] == 1
+            assert time.monotonic() - started < 1, (
+                "Убедитесь, что чтение не ждёт завершения чужой записи."
+            )
+        finally:
+            cursor.execute("ROLLBACK")
@@ -0,0 +1,104 @@
+import gzip
+import json
+
+import pytest
+from django.core.management import call_command
+from django.http import HttpResponse
+
+from pages.staticfiles import StaticFilesMiddleware
+
+
+@pytest.fixture
+def static_root(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "staticfiles": {
+            "BACKEND": (
+                "pages.staticfiles.CompressedManifestStaticFilesStorage"
+            ),
+        },
+    }
+    call_command("collectstatic", interactive=False, verbosity=0)
+    return tmp_path
+
+
+@pytest.fixture
+def middleware(static_root):
+    return StaticFilesMiddleware(lambda request: HttpResponse("view"))
+
+
+def hashed_url(static_root, name):
+    with open(static_root / "staticfiles.json") as manifest:
+        return "/static/" + json.load(manifest)["paths"][name]
+
+
+def test_collectstatic_writes_hashed_compressed_files(static_root):
+    url = hashed_url(static_root, "css/bootstrap.min.css")
+    path = static_root / url.removeprefix("/static/")
+    assert path.exists(), (
+        "Убедитесь, что collectstatic создаёт копии файлов с хэшем в имени."
+    )
+    assert gzip.decompress(
+        (path.parent / (path.name + ".gz")).read_bytes()
+    ) == path.read_bytes(), (
+        "Убедитесь, что рядом со стилями лежит сжатая копия .gz."
+    )
+
+
+def test_middleware_serves_compressed_immutable(
+        rf, static_root, middleware
+):
+    url = hashed_url(static_root, "css/bootstrap.min.css")
+    response = middleware(rf.get(url, HTTP_ACCEPT_ENCODING="gzip"))
+    assert response.status_code == 200
+    assert response["Content-Encoding"] == "gzip"
+    assert response["Content-Type"].startswith("text/css")
+    assert "Accept-Encoding" in response["Vary"]
+    assert "immutable" in response["Cache-Control"], (
+        "Убедитесь, что файлы с хэшем в имени отдаются с "
+        "Cache-Control: immutable."
+    )
+    body = b"".join(response.streaming_content)
+    assert gzip.decompress(body).startswith(b"@charset")
+
+    response = middleware(rf.get(url, HTTP_IF_NONE_MATCH=response["ETag"]))
+    assert response.status_code == 200, (
+        "Убедитесь, что ETag сжатой и исходной версий различаются."
+    )
+    etag = response["ETag"]
+    response = middleware(rf.get(url, HTTP_IF_NONE_MATCH=etag))
+    assert response.status_code == 304
+
+
+def test_middleware_prefers_brotli(rf, static_root, middleware):
+    brotli = pytest.importorskip("brotli")
+    url = hashed_url(static_root, "css/bootstrap.min.css")
+    response = middleware(rf.get(url, HTTP_ACCEPT_ENCODING="gzip, br"))
+    assert response["Content-Encoding"] == "br", (
+        "Убедитесь, что при поддержке brotli клиентом отдаётся копия .br."
+    )
+    body = b"".join(response.streaming_content)
+    assert brotli.decompress(body).startswith(b"@charset")
+
+
+def test_source_map_reference_kept(static_root):
+    url = hashed_url(static_root, "css/bootstrap.min.css")
+    content = (static_root / url.removeprefix("/static/")).read_text()
+    assert "sourceMappingURL=bootstrap.min.css.map" in content, (
+        "Убедитесь, что ссылка на отсутствующую карту кода не мешает "
+        "collectstatic и остаётся без изменений."
+    )
+
+
+def test_middleware_plain_and_unhashed(rf, middleware):
+    response = middleware(rf.get("/static/css/bootstrap.min.css"))
+    assert not response.has_header("Content-Encoding")
+    assert "immutable" not in response["Cache-Control"], (
+        "Убедитесь, что файлы без хэша в имени не помечаются immutable."
+    )
+    response = middleware(rf.get(
+        "/static/css/bootstrap.min.css", HTTP_ACCEPT_ENCODING="gzip;q=0"
+    ))
+    assert not response.has_header("Content-Encoding")
+    assert middleware(rf.get("/about/")).content == b"view"
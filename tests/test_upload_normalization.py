@@ -0,0 +1,41 @@
+from io import BytesIO
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+
+from blog.images import normalize_upload
+
+ORIENTATION = 0x0112
+
+
+def upload(image, name="photo.jpg", **save_options):
+    buffer = BytesIO()
+    image.save(buffer, "JPEG", **save_options)
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/jpeg")
+
+
+@override_settings(BLOG_UPLOAD_MAX_SIDE=200)
+def test_upload_downscaled_rotated_and_stripped():
+    exif = Image.Exif()
+    exif[ORIENTATION] = 6  # повернуть на 90° по часовой стрелке
+    exif[0x010F] = "Camera maker"
+    original = upload(Image.new("RGB", (800, 400)), exif=exif.tobytes())
+
+    normalized = normalize_upload(original)
+    with Image.open(normalized) as result:
+        assert result.size == (100, 200), (
+            "Убедитесь, что изображение поворачивается по EXIF и "
+            "уменьшается до наибольшей допустимой стороны."
+        )
+        assert not result.getexif(), (
+            "Убедитесь, что из загруженного изображения удаляются метаданные."
+        )
+
+
+@override_settings(BLOG_UPLOAD_MAX_PIXELS=10_000)
+def test_decompression_bomb_rejected():
+    with pytest.raises(ValidationError):
+        normalize_upload(upload(Image.new("RGB", (200, 200))))
@@ -0,0 +1,43 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.utils import visibility_bucket, visibility_now
+
+pytestmark = [pytest.mark.django_db]
+
+
+@override_settings(BLOG_VISIBILITY_BUCKET=30)
+def test_visibility_clock_is_bucketed():
+    moment = timezone.now().replace(second=15, microsecond=0)
+    with mock.patch("blog.utils.timezone.now", return_value=moment):
+        assert visibility_now() == moment.replace(second=0)
+        bucket = visibility_bucket()
+    later = moment + timedelta(seconds=10)
+    with mock.patch("blog.utils.timezone.now", return_value=later):
+        assert visibility_bucket() == bucket, (
+            "Убедитесь, что в пределах одного интервала часы видимости "
+            "возвращают одно и то же значение."
+        )
+
+
+def test_scheduled_post_appears_without_restart(
+        mixer, client, user, published_category
+):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(minutes=5),
+    )
+    assert post not in client.get("/").context["page_obj"]
+    future = timezone.now() + timedelta(minutes=10)
+    with mock.patch("blog.utils.timezone.now", return_value=future):
+        assert post in client.get("/").context["page_obj"], (
+            "Убедитесь, что отложенная публикация появляется на главной "
+            "странице после наступления даты публикации."
+        )